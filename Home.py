@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image
 
 st.set_page_config(
     page_title='Home',
@@ -7,8 +6,7 @@ st.set_page_config(
 )
 
 #image_path = '/home/ezequiel/Documentos/Comunidade_DS/Analise_dados_com_python/'
-image = Image.open('logo.jpeg')
-st.sidebar.image(image, width=120)
+st.sidebar.image('logo.jpeg', width=120)
 
 st.sidebar.markdown('# Curry Company')
 st.sidebar.markdown('## Fastest Delivery in Town')
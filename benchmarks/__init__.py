@@ -0,0 +1,8 @@
+""" Benchmarks do pipeline de dados da Curry Company.
+
+    Gerar um dataset sintético no esquema do train.csv:
+        python -m benchmarks.generate 1000000 benchmarks/data/train_1000000.csv
+
+    Medir tempo e pico de memória em vários tamanhos e gravar o relatório JSON:
+        python -m benchmarks.run --sizes 100000 1000000 --output benchmarks/results/report.json
+"""
@@ -0,0 +1,115 @@
+# Libraries
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from curry import schema
+
+# colunas na ordem do train.csv (inclui Time_Orderd e Time_Order_picked, que a ingestão ignora)
+COLUMNS = ['ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Restaurant_latitude',
+           'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude', 'Order_Date',
+           'Time_Orderd', 'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density', 'Vehicle_condition',
+           'Type_of_order', 'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+
+CITIES = ['Metropolitian', 'Urban', 'Semi-Urban']
+TRAFFIC = ['Low', 'Medium', 'High', 'Jam']
+WEATHER = ['Sunny', 'Stormy', 'Cloudy', 'Fog', 'Windy', 'Sandstorms']
+ORDERS = ['Snack', 'Meal', 'Drinks', 'Buffet']
+VEHICLES = ['motorcycle', 'scooter', 'electric_scooter']
+
+# fração de valores ausentes ('NaN ') nas colunas que têm sentinela no arquivo original
+NA_RATE = 0.03
+
+# linhas geradas e gravadas por vez (a memória do gerador não depende do tamanho total)
+CHUNK_ROWS = 500_000
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def _sentinel(rng, values, rate=NA_RATE):
+    # troca uma fração dos valores pela sentinela de ausência do arquivo original
+    values = values.astype(object)
+    values[rng.random(len(values)) < rate] = schema.NA_VALUES[0]
+    return values
+
+
+def _padded(rng, options, n, p=None):
+    # texto com o espaço em branco no final, como nas colunas de STRIP_COLUMNS do arquivo original
+    return np.char.add(np.array(options, dtype=object)[rng.choice(len(options), n, p=p)].astype(str), ' ')
+
+
+def generate_chunk(rng, start, n, restaurants, couriers, first_day, days):
+    """ Finalidade da função:
+        1. Gerar n pedidos sintéticos no esquema do train.csv a partir da linha start
+        2. Restaurantes e entregadores são sorteados de um conjunto fixo (repetem entre os blocos), os locais
+           de entrega ficam em volta do restaurante e as sentinelas 'NaN ' e o prefixo '(min) ' são mantidos
+        Input: gerador aleatório, primeira linha, quantidade de linhas, coordenadas dos restaurantes,
+               quantidade de entregadores, primeiro dia, quantidade de dias
+        Output: Dataframe bruto (todas as colunas como no CSV)
+    """
+    r = rng.integers(0, len(restaurants), n)
+    courier = rng.integers(0, couriers, n)
+    lat, lon = restaurants[r, 0], restaurants[r, 1]
+    dates = first_day + rng.integers(0, days, n).astype('timedelta64[D]')
+    time_taken = rng.integers(10, 55, n)
+
+    return pd.DataFrame({
+        'ID': np.char.add(np.char.add('0x', np.char.mod('%06x', np.arange(start, start + n))), ' '),
+        'Delivery_person_ID': np.char.add(np.char.mod('CITYRES%03dDEL', courier // 100),
+                                          np.char.mod('%02d ', courier % 100)),
+        'Delivery_person_Age': _sentinel(rng, rng.integers(20, 40, n)),
+        'Delivery_person_Ratings': _sentinel(rng, np.round(rng.uniform(2.5, 5, n), 1)),
+        'Restaurant_latitude': lat,
+        'Restaurant_longitude': lon,
+        'Delivery_location_latitude': lat + rng.normal(0, 0.05, n),
+        'Delivery_location_longitude': lon + rng.normal(0, 0.05, n),
+        'Order_Date': pd.to_datetime(dates).strftime(schema.DATE_FORMAT),
+        'Time_Orderd': _sentinel(rng, np.full(n, '11:30:00', dtype=object)),
+        'Time_Order_picked': '11:45:00',
+        'Weatherconditions': np.char.add('conditions ', np.array(WEATHER)[rng.integers(0, len(WEATHER), n)]),
+        'Road_traffic_density': _sentinel(rng, _padded(rng, TRAFFIC, n)),
+        'Vehicle_condition': rng.integers(0, 3, n),
+        'Type_of_order': _padded(rng, ORDERS, n),
+        'Type_of_vehicle': _padded(rng, VEHICLES, n),
+        'multiple_deliveries': _sentinel(rng, rng.integers(0, 3, n)),
+        'Festival': _sentinel(rng, _padded(rng, ['No', 'Yes'], n, p=[0.95, 0.05])),
+        'City': _sentinel(rng, _padded(rng, CITIES, n)),
+        'Time_taken(min)': np.char.add(schema.TIME_PREFIX, time_taken.astype(str)),
+    }, columns=COLUMNS)
+
+
+def generate(rows, path, seed=0, days=365, chunk_rows=CHUNK_ROWS):
+    """ Finalidade da função:
+        1. Gravar um CSV sintético com rows pedidos no esquema do train.csv, bloco a bloco
+        2. Restaurantes (~1 para cada 100 pedidos) e entregadores (~1 para cada 30 pedidos) crescem
+           com o tamanho, como num histórico real
+        Input: quantidade de linhas, caminho do CSV, semente, quantidade de dias, linhas por bloco
+        Output: caminho do CSV
+    """
+    rng = np.random.default_rng(seed)
+    n_restaurants = max(rows // 100, 10)
+    restaurants = np.column_stack([rng.uniform(10, 30, n_restaurants), rng.uniform(70, 88, n_restaurants)])
+    couriers = max(rows // 30, 10)
+    first_day = np.datetime64('2022-01-01')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        df_aux = generate_chunk(rng, start, n, restaurants, couriers, first_day, days)
+        df_aux.to_csv(tmp_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera um train.csv sintético para os benchmarks.')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+    generate(args.rows, args.path, seed=args.seed, days=args.days)
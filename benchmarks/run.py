@@ -0,0 +1,185 @@
+# Libraries
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import generate
+from curry import partitions, schema
+from curry.cube import build_cube
+from curry.downsample import bucket_daily
+from curry.geobins import build_geo_bins, heat_points
+from curry.loader import clean_code, derive_columns
+from curry.parallel import parallel_clean
+from curry.metrics import city_centroids, festival_delivery_time, mean_distance_by_city
+from curry.ranking import top_couriers
+from curry.sketches import build_sketches, delivery_time_percentiles, distinct_count
+from curry.timeindex import build_time_index, daily_orders
+from curry.weekly import weekly_orders_per_courier
+
+SIZES = [100_000, 1_000_000]
+DATA_DIR = os.path.join('benchmarks', 'data')
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def measure(fn, repeat=3):
+    """ Finalidade da função:
+        1. Medir o tempo de fn (mediana e mínimo de repeat execuções)
+        2. Medir o pico de memória alocada por fn com tracemalloc, numa execução separada
+           (o rastreamento deixa o código mais lento e não entra na medida de tempo)
+        Input: função sem argumentos, quantidade de repetições
+        Output: dict com seconds, min_seconds e peak_mb; resultado da última execução
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'seconds': float(np.median(times)), 'min_seconds': min(times), 'peak_mb': peak / 1024 ** 2}, result
+
+
+def bench_size(path, repeat=3, workers=None):
+    """ Finalidade da função:
+        1. Medir as etapas do pipeline sobre um CSV: leitura, limpeza, estruturas derivadas e a agregação
+           de cada painel (a mesma chamada de curry que a página faz)
+        2. Com workers, medir também a ingestão paralela (leitura + limpeza + compactação por fatias)
+        3. Com pyarrow, medir a gravação do layout particionado e a leitura das partições de todo o período
+           e de um mês sem 'Jam' (predicate pushdown)
+        Input: caminho do CSV, quantidade de repetições, quantidade de processos
+        Output: lista de dicts com step, seconds, min_seconds e peak_mb
+    """
+    results = []
+
+    def step(name, fn):
+        stats, result = measure(fn, repeat)
+        results.append(dict(step=name, **stats))
+        return result
+
+    raw = step('read_source', lambda: schema.read_source(path))
+    df1 = step('clean_code', lambda: clean_code(raw.copy()))
+    df1 = step('derive_compact_sort', lambda: schema.compact(derive_columns(df1.copy())).sort_values(
+        'Order_Date', kind='mergesort', ignore_index=True))
+    del raw
+    if workers:
+        step('parallel_clean', lambda: parallel_clean(path, workers))
+
+    time_index = step('build_time_index', lambda: build_time_index(df1))
+    cube = step('build_cube', lambda: build_cube(df1))
+    geo_bins = step('build_geo_bins', lambda: build_geo_bins(df1))
+    sketches = step('build_sketches', lambda: build_sketches(df1))
+
+    window = (time_index['days'][0], time_index['days'][-1])
+    traffic = list(time_index['traffic'])
+    if partitions.feather is not None:
+        root = os.path.splitext(path)[0] + '.bench.parts'
+        step('write_partitions', lambda: (shutil.rmtree(root, ignore_errors=True),
+                                          partitions.write_partitions(df1, root)))
+        available = partitions.list_partitions(root)
+        columns = ['Delivery_person_ID', 'Order_Date', 'Road_traffic_density', 'City']
+        month = (window[0], window[0] + np.timedelta64(30, 'D'))
+        step('read_partitions_all', lambda: partitions.read_partitions(available['file'].tolist(), columns))
+        step('read_partitions_month', lambda: partitions.read_partitions(
+            partitions.select_partitions(available, month, [t for t in traffic if t != 'Jam']), columns))
+        shutil.rmtree(root, ignore_errors=True)
+    step('order_metric', lambda: bucket_daily(daily_orders(time_index, window, traffic), 'Order_Date', 'orders', 500))
+    step('order_share_by_week', lambda: weekly_orders_per_courier(df1))
+    step('country_map', lambda: (heat_points(geo_bins, 5, window, traffic), city_centroids(df1)))
+    step('top_delivers', lambda: (top_couriers(df1, metric='max', ascending=True),
+                                  top_couriers(df1, metric='max', ascending=False)))
+    step('sketch_queries', lambda: (distinct_count(sketches['couriers'], window, traffic, by_week=True),
+                                    delivery_time_percentiles(sketches, window, traffic)))
+    step('distance', lambda: mean_distance_by_city(df1))
+    step('avg_std_time_delivery', lambda: [festival_delivery_time(cube, statistics, festival)
+                                           for statistics in ['mean_delivery_time', 'std_delivery_time']
+                                           for festival in ['Yes', 'No']])
+    return results
+
+
+def git_commit():
+    # commit atual, para comparar relatórios entre versões do código
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, data_dir=DATA_DIR, repeat=3, seed=0, workers=None):
+    """ Finalidade da função:
+        1. Gerar (se ainda não existir) um CSV sintético para cada tamanho e medir o pipeline sobre ele
+        Input: lista de tamanhos (linhas), pasta dos CSVs, repetições, semente do gerador, processos
+        Output: dict do relatório (ambiente + uma entrada por tamanho e etapa)
+    """
+    report = {
+        'commit': git_commit(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': repeat,
+        'workers': workers,
+        'results': [],
+    }
+    for rows in sizes:
+        path = os.path.join(data_dir, 'train_{}.csv'.format(rows))
+        if not os.path.exists(path):
+            generate(rows, path, seed=seed)
+        for result in bench_size(path, repeat, workers):
+            report['results'].append(dict(rows=rows, **result))
+            print('{:>10} {:<24} {:>9.3f}s {:>9.1f} MB'.format(rows, result['step'], result['seconds'],
+                                                                result['peak_mb']))
+    return report
+
+
+def compare(report, baseline):
+    """ Finalidade da função:
+        1. Comparar um relatório com outro (ex.: de um commit anterior) por tamanho e etapa
+        Input: relatório atual, relatório de referência
+        Output: lista de dicts com rows, step, seconds, baseline_seconds e ratio (atual / referência)
+    """
+    previous = {(r['rows'], r['step']): r['seconds'] for r in baseline['results']}
+    rows = []
+    for r in report['results']:
+        before = previous.get((r['rows'], r['step']))
+        if before:
+            rows.append({'rows': r['rows'], 'step': r['step'], 'seconds': r['seconds'],
+                         'baseline_seconds': before, 'ratio': r['seconds'] / before})
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mede tempo e memória do pipeline em datasets sintéticos.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='mede também a ingestão paralela com esse número de processos')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', 'report.json'))
+    parser.add_argument('--baseline', help='relatório de outro commit para comparar')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.data_dir, args.repeat, args.seed, args.workers)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(report, json.load(f))
+        for r in report['comparison']:
+            print('{:>10} {:<24} {:>6.2f}x'.format(r['rows'], r['step'], r['ratio']))
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
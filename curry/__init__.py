@@ -0,0 +1,7 @@
+""" Pacote de dados da Curry Company.
+
+    Concentra a leitura e a limpeza do dataset usadas por todas as páginas do dashboard.
+"""
+from curry.loader import DATA_PATH, clean_code, current_version, data_version, ingest_report, load_dataset
+
+__all__ = ['DATA_PATH', 'clean_code', 'current_version', 'data_version', 'ingest_report', 'load_dataset']
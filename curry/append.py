@@ -0,0 +1,109 @@
+# Libraries
+import argparse
+import json
+import os
+import threading
+
+import pandas as pd
+
+from curry import partitions, schema
+from curry.loader import (BATCH_KEY, DATA_PATH, EXTENT_KEY, STREAM_CHUNK_ROWS, batch_files, batch_count,
+                          clean_code, columnar_path, data_version, derive_columns, extent, partitions_path,
+                          read_batch, read_clean, remove_stale, source_version)
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:     # sem pyarrow não há dataset guardado para acrescentar lotes
+    pa = feather = None
+
+# um lote acrescentado por vez em cada processo (a numeração dos lotes é sequencial)
+_lock = threading.Lock()
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def clean_batch(batch_path, report=None):
+    """ Finalidade da função:
+        1. Ler e limpar apenas o lote novo, com as mesmas regras, colunas derivadas e tipos do dataset guardado
+        2. Ordenar o lote por Order_Date, como o dataset
+        Input: caminho do CSV do lote (mesmo esquema do train.csv), report (dict opcional)
+        Output: Dataframe limpo do lote
+    """
+    df1 = schema.compact(derive_columns(clean_code(schema.read_source(batch_path), report)))
+    return df1.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+
+
+def stored_extent(path, version):
+    """ Finalidade da função:
+        1. Ler a extensão guardada (linhas e última Order_Date) dos metadados do último lote da versão ou,
+           sem lotes, do arquivo colunar: custo constante, sem ler nenhuma coluna
+        Input: caminho do CSV, versão dos dados
+        Output: dict com rows e last (ISO, None sem linhas)
+    """
+    files = batch_files(path, version)
+    if files:
+        return read_batch(files[-1], [])[1]['extent']
+    table = feather.read_table(columnar_path(path, version), columns=[], memory_map=True)
+    return json.loads(table.schema.metadata[EXTENT_KEY])
+
+
+def append_batch(batch_path, path=DATA_PATH, use_hash=False):
+    """ Finalidade da função:
+        1. Limpar só o lote e guardá-lo como um Feather na pasta de lotes do CSV (loader.appends_path):
+           a versão dos dados ganha o sufixo '+<nº de lotes>' e os caches das versões anteriores deixam de valer
+        2. Montar o layout particionado da nova versão reaproveitando o atual (só as partições tocadas
+           pelo lote são regravadas)
+        3. As estruturas derivadas em cache (índice temporal, cubo, grade, sketches, perfis dos entregadores)
+           são atualizadas só com o lote na próxima leitura (append de cada uma, ver loader.load_derived)
+        Lotes com datas anteriores às guardadas são aceitos, mas a próxima leitura reordena o dataset
+        e reconstrói as estruturas que guardam posições de linhas.
+        Input: caminho do CSV do lote, caminho do CSV do dataset, use_hash
+        Output: dict com version, rows_read, rows_rejected, rows_appended e ordered
+    """
+    if feather is None:
+        raise RuntimeError('acrescentar lotes requer pyarrow (o dataset guardado é um arquivo Feather)')
+
+    with _lock:
+        version = data_version(path, use_hash)
+        root = partitions_path(path, version)
+        # no modo em blocos não há dataset guardado: o lote só entra nos agregados
+        stored = not STREAM_CHUNK_ROWS
+        if stored and not (os.path.exists(columnar_path(path, version)) and os.path.isdir(root)):
+            read_clean(path, version, columns=[])
+
+        report = {}
+        batch = clean_batch(batch_path, report)
+        previous = stored_extent(path, version) if stored else None
+        rows = None if previous is None else previous['rows']
+        ordered = stored and (previous['last'] is None or not len(batch)
+                              or batch['Order_Date'].iloc[0] >= pd.Timestamp(previous['last']))
+
+        new_version = '{}+{}'.format(source_version(version), batch_count(version) + 1)
+        if ordered:
+            partitions.append_partitions(batch, root, partitions_path(path, new_version), rows)
+
+        # o arquivo do lote é gravado por último: só então a nova versão passa a existir
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[BATCH_KEY] = json.dumps({'report': report, 'offset': rows, 'ordered': bool(ordered),
+                                          'extent': extent(batch, previous) if stored else None}).encode()
+        target = batch_files(path, new_version)[-1]
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = '{}.{}.tmp'.format(target, os.getpid())
+        feather.write_feather(table.replace_schema_metadata(metadata), tmp, compression='uncompressed')
+        os.replace(tmp, target)
+        remove_stale(path, 'parts', partitions_path(path, new_version))
+
+    return {'version': new_version, 'rows_read': report['rows_read'], 'rows_rejected': report['rows_rejected'],
+            'rows_appended': len(batch), 'ordered': bool(ordered)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Acrescenta um lote de pedidos (CSV no esquema do train.csv) ao dataset.')
+    parser.add_argument('batch')
+    parser.add_argument('--data', default=DATA_PATH, help='CSV do dataset (padrão: {})'.format(DATA_PATH))
+    parser.add_argument('--use-hash', action='store_true', help='versão dos dados pelo hash do CSV')
+    args = parser.parse_args()
+    print(json.dumps(append_batch(args.batch, args.data, args.use_hash)))
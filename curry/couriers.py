@@ -0,0 +1,154 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from curry.loader import DATA_PATH, load_derived
+
+# somas por entregador guardadas ao lado do perfil: permitem acrescentar lotes sem reler os pedidos
+TOTALS = ['orders', 'rating_count', 'rating_sum', 'time_sum', 'multiple_sum']
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def _join_values(df1, col):
+    # valores distintos de col por entregador, juntos em uma string ('Metropolitian, Urban')
+    df_aux = df1.groupby(['Delivery_person_ID', col], observed=True).size().reset_index()
+    return df_aux.groupby('Delivery_person_ID', observed=True)[col].agg(lambda values: ', '.join(sorted(map(str, values))))
+
+
+def _union_values(left, right):
+    # junção de duas strings de valores distintos ('Metropolitian, Urban'), sem repetir valores
+    values = set()
+    for text in [left, right]:
+        if isinstance(text, str):
+            values.update(text.split(', '))
+    return ', '.join(sorted(values))
+
+
+def _profiles(totals):
+    # perfil exibido a partir das somas: cada média é soma / contagem
+    return pd.DataFrame({
+        'orders': totals['orders'].astype('int64'),
+        'mean_rating': totals['rating_sum'] / totals['rating_count'].where(totals['rating_count'] > 0),
+        'mean_delivery_time': totals['time_sum'] / totals['orders'],
+        'max_delivery_time': totals['max_delivery_time'],
+        'multiple_delivery_rate': totals['multiple_sum'] / totals['orders'],
+        'cities': totals['cities'],
+        'vehicles': totals['vehicles'],
+    }, index=totals.index)
+
+
+def build_courier_profiles(df1):
+    """ Finalidade da função:
+        1. Montar o perfil de cada entregador: pedidos, avaliação média, tempo médio e máximo de entrega,
+           cidades atendidas, tipos de veículo e taxa de entregas múltiplas
+        2. Guardar as somas de cada perfil (TOTALS), para acrescentar lotes com append_courier_profiles
+        3. Montar um índice das linhas de cada entregador (posições agrupadas por entregador, em ordem de data),
+           para o detalhamento de um entregador sem varrer o dataset
+        Input: Dataframe limpo
+        Output: dict com 'profiles' (Dataframe indexado por Delivery_person_ID), 'totals', 'couriers',
+                'positions' e 'offsets'
+    """
+    df_aux = df1.assign(
+        time=df1['Time_taken(min)'].astype('float64'),
+        multiple=(df1['multiple_deliveries'] > 0).astype('float64'),
+    )
+    totals = df_aux.groupby('Delivery_person_ID', observed=True).agg(
+        orders=('time', 'size'),
+        rating_count=('Delivery_person_Ratings', 'count'),
+        rating_sum=('Delivery_person_Ratings', 'sum'),
+        time_sum=('time', 'sum'),
+        max_delivery_time=('time', 'max'),
+        multiple_sum=('multiple', 'sum'),
+    )
+    totals['cities'] = _join_values(df1, 'City')
+    totals['vehicles'] = _join_values(df1, 'Type_of_vehicle')
+
+    # linhas de cada entregador: ordenação estável pelos códigos mantém a ordem de data dentro do grupo
+    couriers = df1['Delivery_person_ID'].cat.categories
+    codes = df1['Delivery_person_ID'].cat.codes.to_numpy()
+    positions = np.argsort(codes, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(couriers)))])
+    positions = positions[len(codes) - offsets[-1]:]       # códigos -1 (ausentes) ficam no início
+
+    return {'profiles': _profiles(totals), 'totals': totals, 'couriers': couriers, 'positions': positions,
+            'offsets': offsets}
+
+
+def append_courier_profiles(store, part, offset):
+    """ Finalidade da função:
+        1. Acrescentar aos perfis os perfis de um lote novo: somas somadas, máximo dos máximos e
+           união das cidades e dos veículos (custo proporcional ao nº de entregadores)
+        2. Entregadores novos entram no final do índice de linhas; as linhas do lote (posições a partir de
+           offset) entram no final da fatia de cada entregador, que continua em ordem de data
+        Input: perfis, perfis do lote (build_courier_profiles), linhas antes do lote
+        Output: dict combinado
+    """
+    index = store['totals'].index.astype(str).union(part['totals'].index.astype(str))
+    old = store['totals'].set_axis(store['totals'].index.astype(str)).reindex(index)
+    new = part['totals'].set_axis(part['totals'].index.astype(str)).reindex(index)
+
+    totals = old[TOTALS].fillna(0) + new[TOTALS].fillna(0)
+    totals['max_delivery_time'] = np.fmax(old['max_delivery_time'], new['max_delivery_time'])
+    for col in ['cities', 'vehicles']:
+        totals[col] = [_union_values(left, right) for left, right in zip(old[col], new[col])]
+
+    # posições do lote agrupadas pelo código combinado do entregador (os novos ficam no final)
+    couriers = store['couriers'].append(part['couriers'].difference(store['couriers']))
+    counts = np.zeros(len(couriers), dtype='int64')
+    codes = couriers.get_indexer(part['couriers'])
+    counts[codes] = np.diff(part['offsets'])
+    order = np.argsort(np.repeat(codes, np.diff(part['offsets'])), kind='stable')
+
+    offsets = np.append(store['offsets'], np.full(len(couriers) - len(store['couriers']), store['offsets'][-1]))
+    positions = np.insert(store['positions'], np.repeat(offsets[1:], counts), part['positions'][order] + offset)
+    offsets = offsets + np.concatenate([[0], np.cumsum(counts)])
+
+    return {'profiles': _profiles(totals), 'totals': totals, 'couriers': couriers, 'positions': positions,
+            'offsets': offsets}
+
+
+def load_courier_profiles(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir os perfis de entregadores uma única vez por versão dos dados (cache do processo)
+        2. Lotes acrescentados (curry.append) atualizam os perfis com append_courier_profiles
+        Input: caminho do arquivo
+        Output: dict dos perfis (compartilhado, não deve ser alterado)
+    """
+    columns = ['Delivery_person_ID', 'Delivery_person_Ratings', 'Time_taken(min)', 'City',
+               'Type_of_vehicle', 'multiple_deliveries']
+    return load_derived('courier_profiles', build_courier_profiles, path, columns, append=append_courier_profiles)
+
+
+def courier_rows(store, courier_id, window=None):
+    """ Finalidade da função:
+        1. Posições (no dataset ordenado por data) dos pedidos de um entregador, sem varrer o dataset
+        2. window (slice de curry.timeindex.row_slice) restringe ao período com searchsorted,
+           pois as posições de cada entregador estão em ordem crescente
+        Input: perfis, ID do entregador, slice opcional
+        Output: array com as posições dos pedidos
+    """
+    code = store['couriers'].get_indexer([courier_id])[0]
+    if code < 0:
+        return np.array([], dtype='int64')
+
+    positions = store['positions'][store['offsets'][code]:store['offsets'][code + 1]]
+    if window is not None:
+        positions = positions[np.searchsorted(positions, window.start):np.searchsorted(positions, window.stop)]
+    return positions
+
+
+def search_couriers(store, query='', limit=20):
+    """ Finalidade da função:
+        1. Buscar entregadores pelo início do Delivery_person_ID no servidor: só os encontrados vão para a página
+        2. Sem texto de busca, nada é devolvido (a lista completa de IDs não é enviada ao navegador)
+        Input: perfis, texto de busca, limite
+        Output: lista com no máximo limit IDs, em ordem alfabética
+    """
+    query = query.strip().upper()
+    if not query:
+        return []
+
+    ids = store['profiles'].index.astype(str)
+    return sorted(ids[ids.str.upper().str.startswith(query)])[:limit]
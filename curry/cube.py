@@ -0,0 +1,130 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from curry.loader import DATA_PATH, STREAM_CHUNK_ROWS, load_derived
+
+# dimensões do cubo: cada célula é uma combinação observada destes valores
+DIMENSIONS = ['Order_Date', 'City', 'Road_traffic_density', 'Festival', 'Type_of_order', 'Weatherconditions']
+
+# medidas somáveis de cada célula (contagem, soma e soma dos quadrados)
+MEASURES = ['orders', 'time_sum', 'time_sumsq', 'rating_count', 'rating_sum', 'rating_sumsq']
+
+# extremos de cada célula e a agregação que os combina
+EXTREMES = {'time_min': 'min', 'time_max': 'max', 'rating_min': 'min', 'rating_max': 'max'}
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def build_cube(df1):
+    """ Finalidade da função:
+        1. Agregar os pedidos em células data × cidade × tráfego × festival × tipo de pedido × clima
+        2. Guardar, por célula, contagem, soma, soma dos quadrados, mínimo e máximo de Time_taken(min) e de
+           Delivery_person_Ratings (avaliações ausentes não entram na contagem de avaliações)
+        3. Dimensão ausente (ex.: clima 'NaN ') forma uma célula própria: o cubo conta todos os pedidos,
+           como o índice temporal
+        Todas as medidas são combináveis: cubos de partes do dataset se juntam com merge_cubes.
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por célula (DIMENSIONS + MEASURES + EXTREMES), ordenado por Order_Date
+    """
+    time = df1['Time_taken(min)'].astype('float64')
+    rating = df1['Delivery_person_Ratings'].astype('float64')
+
+    df_aux = df1.loc[:, DIMENSIONS].assign(time=time, time_sq=time ** 2, rating=rating, rating_sq=rating ** 2)
+    cube = df_aux.groupby(DIMENSIONS, observed=True, dropna=False).agg(
+        orders=('time', 'size'),
+        time_sum=('time', 'sum'),
+        time_sumsq=('time_sq', 'sum'),
+        rating_count=('rating', 'count'),
+        rating_sum=('rating', 'sum'),
+        rating_sumsq=('rating_sq', 'sum'),
+        time_min=('time', 'min'),
+        time_max=('time', 'max'),
+        rating_min=('rating', 'min'),
+        rating_max=('rating', 'max'),
+    ).reset_index()
+    return cube
+
+
+def merge_cubes(cubes):
+    """ Finalidade da função:
+        1. Juntar cubos calculados sobre partes do dataset (ex.: blocos do CSV) num único cubo
+        2. Células iguais somam contagens e somas e combinam mínimos e máximos
+        Input: lista de cubos
+        Output: cubo combinado, ordenado por Order_Date
+    """
+    return rollup(pd.concat(cubes, ignore_index=True), DIMENSIONS, derived=False)
+
+
+def append_cube(cube, part, offset=None):
+    """ Finalidade da função:
+        1. Acrescentar ao cubo o cubo de um lote novo (custo proporcional ao nº de células, sem reler os pedidos)
+        2. As dimensões de texto voltam a ser categóricas, como no cubo montado de uma vez
+        Input: cubo, cubo do lote, linhas antes do lote (não usado: o cubo não guarda posições)
+        Output: cubo combinado, ordenado por Order_Date
+    """
+    cube = merge_cubes([cube, part])
+    for col in DIMENSIONS[1:]:
+        cube[col] = cube[col].astype('category')
+    return cube
+
+
+def load_cube(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir o cubo uma única vez por versão dos dados (cache do processo)
+        2. No modo em blocos (STREAM_CHUNK_ROWS) o cubo é agregado bloco a bloco, sem o dataset em memória
+        3. Lotes acrescentados (curry.append) atualizam o cubo com append_cube
+        Input: caminho do arquivo
+        Output: Dataframe do cubo (compartilhado, não deve ser alterado)
+    """
+    if STREAM_CHUNK_ROWS:
+        from curry.stream import load_streamed
+        return load_streamed(path)['cube']
+
+    columns = DIMENSIONS + ['Time_taken(min)', 'Delivery_person_Ratings']
+    return load_derived('cube', build_cube, path, columns, append=append_cube)
+
+
+def filter_cube(cube, date_range=None, traffic_options=None):
+    """ Finalidade da função:
+        1. Aplicar os filtros da barra lateral sobre as células do cubo (custo proporcional ao nº de células)
+        2. O cubo é ordenado por Order_Date, então a janela de datas é uma fatia encontrada com searchsorted
+        Input: cubo, tupla (início, fim) inclusiva, lista de condições de trânsito
+        Output: cubo filtrado
+    """
+    if date_range is not None:
+        start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+        dates = cube['Order_Date'].to_numpy()
+        cube = cube.iloc[np.searchsorted(dates, start, side='left'):np.searchsorted(dates, end, side='right')]
+    if traffic_options is not None:
+        cube = cube.loc[cube['Road_traffic_density'].isin(traffic_options), :]
+    return cube
+
+
+def rollup(cube, by, derived=True):
+    """ Finalidade da função:
+        1. Somar as medidas do cubo (e combinar os extremos) agrupando pelas dimensões em by
+        2. Derivar média e desvio padrão amostral a partir de contagem, soma e soma dos quadrados
+        3. Valores ausentes de by formam um grupo próprio (os totais continuam iguais ao nº de pedidos)
+        Input: cubo (filtrado), lista de dimensões, derived (False devolve só as medidas)
+        Output: Dataframe com by + MEASURES + EXTREMES + mean/std do tempo de entrega e da avaliação
+    """
+    aggregations = dict({m: 'sum' for m in MEASURES}, **EXTREMES)
+    df_aux = cube.groupby(by, observed=True, dropna=False).agg(aggregations).reset_index()
+    if not derived:
+        return df_aux
+
+    df_aux['mean_delivery_time'], df_aux['std_delivery_time'] = _mean_std(
+        df_aux['orders'], df_aux['time_sum'], df_aux['time_sumsq'])
+    df_aux['mean_rating'], df_aux['std_rating'] = _mean_std(
+        df_aux['rating_count'], df_aux['rating_sum'], df_aux['rating_sumsq'])
+    return df_aux
+
+
+def _mean_std(count, total, total_sq):
+    # média e desvio padrão amostral (ddof=1, igual ao pandas) a partir das somas
+    count = count.astype('float64')
+    mean = total / count.where(count > 0)
+    var = (total_sq - count * mean ** 2) / (count - 1).where(count > 1)
+    return mean, np.sqrt(var.clip(lower=0))
@@ -0,0 +1,63 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+# períodos usados para agrupar séries diárias longas, do mais fino ao mais grosso
+BUCKETS = [('D', 'dia'), ('W-SAT', 'semana'), ('MS', 'mês'), ('QS', 'trimestre'), ('YS', 'ano')]
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def lttb(x, y, n_out):
+    """ Finalidade da função:
+        1. Reduzir uma série a n_out pontos preservando sua forma (Largest-Triangle-Three-Buckets)
+        2. Mantém o primeiro e o último ponto; em cada bucket escolhe o ponto que forma o maior triângulo
+           com o ponto escolhido antes e com a média do próximo bucket
+        Input: arrays x e y (x categórico, como rótulos de semana, usa a posição do ponto), quantidade de pontos desejada
+        Output: array com os índices dos pontos escolhidos
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype('int64').astype('float64')
+    elif np.issubdtype(x.dtype, np.number):
+        x = x.astype('float64')
+    else:
+        x = np.arange(n, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    chosen = np.empty(n_out, dtype='int64')
+    chosen[0], chosen[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        chosen[i + 1] = a
+    return chosen
+
+
+def bucket_daily(df1, date_col, value_col, max_points):
+    """ Finalidade da função:
+        1. Agrupar uma série diária de contagens em semana, mês, trimestre ou ano, no primeiro período
+           em que a série cabe em max_points (as somas continuam corretas, ao contrário de amostrar pontos)
+        Input: Dataframe com a coluna de data e a coluna de valores, limite de pontos
+        Output: Dataframe agrupado, nome do período usado
+    """
+    for freq, label in BUCKETS:
+        if freq == 'D':
+            df_aux = df1.loc[:, [date_col, value_col]]
+        else:
+            df_aux = df1.groupby(pd.Grouper(key=date_col, freq=freq))[value_col].sum().reset_index()
+        if len(df_aux) <= max_points:
+            break
+    return df_aux, label
@@ -0,0 +1,47 @@
+# Libraries
+import numpy as np
+
+# raio médio da Terra em km (mesmo valor usado pelo pacote haversine)
+EARTH_RADIUS_KM = 6371.0088
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def haversine_np(lat1, lon1, lat2, lon2):
+    """ Finalidade da função:
+        1. Calcular a distância de grande círculo (haversine) entre pares de pontos
+        2. Opera sobre arrays inteiros com NumPy, sem loop em Python
+        Input: arrays (ou Series) de latitude e longitude de origem e destino, em graus
+        Output: array com as distâncias em km
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def delivery_distance(df1):
+    """ Finalidade da função:
+        1. Calcular a distância entre o restaurante e o local de entrega de cada pedido
+        Input: Dataframe com as colunas de latitude/longitude do restaurante e da entrega
+        Output: array com as distâncias em km
+    """
+    return haversine_np(df1['Restaurant_latitude'], df1['Restaurant_longitude'],
+                        df1['Delivery_location_latitude'], df1['Delivery_location_longitude'])
+
+
+def restaurant_id(lat, lon, decimals=4):
+    """ Finalidade da função:
+        1. Gerar um ID inteiro estável para o restaurante a partir das coordenadas arredondadas
+        2. Latitude e longitude arredondadas viram inteiros e são empacotadas em um único int64
+           (sem colisões e igual entre versões dos dados, já que só depende das coordenadas)
+        Input: arrays (ou Series) de latitude e longitude do restaurante, casas decimais
+        Output: array int64 com o ID do restaurante
+    """
+    scale = 10 ** decimals
+    lat_i = np.round(np.asarray(lat, dtype=float) * scale).astype('int64') + 90 * scale
+    lon_i = np.round(np.asarray(lon, dtype=float) * scale).astype('int64') + 180 * scale
+    return lat_i * (360 * scale + 1) + lon_i
@@ -0,0 +1,112 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from curry.loader import DATA_PATH, STREAM_CHUNK_ROWS, load_derived
+
+# níveis de zoom do mapa atendidos pela grade; o mais fino é o guardado, os demais são derivados dele
+MIN_ZOOM = 4
+MAX_ZOOM = 11
+
+# limite de células enviadas ao navegador: acima dele a grade fica mais grossa
+MAX_CELLS = 5000
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def cell_degrees(zoom):
+    """ Finalidade da função:
+        1. Tamanho da célula da grade (em graus) para um nível de zoom, ~16 px de lado no mapa
+        2. Cada nível tem metade do tamanho do anterior, então as grades são aninhadas
+        Input: nível de zoom
+        Output: tamanho da célula em graus
+    """
+    return 22.5 / 2 ** zoom
+
+
+def build_geo_bins(df1):
+    """ Finalidade da função:
+        1. Associar cada local de entrega a uma célula da grade mais fina (MAX_ZOOM)
+        2. Contar os pedidos por data × condição de trânsito × célula, para respeitar os filtros da barra lateral
+        Input: Dataframe limpo
+        Output: Dataframe com Order_Date, Road_traffic_density, cell_lat, cell_lon e orders, ordenado por data
+    """
+    cell = cell_degrees(MAX_ZOOM)
+    df_aux = pd.DataFrame({
+        'Order_Date': df1['Order_Date'].to_numpy(),
+        'Road_traffic_density': df1['Road_traffic_density'],
+        'cell_lat': np.floor(df1['Delivery_location_latitude'].to_numpy() / cell).astype('int32'),
+        'cell_lon': np.floor(df1['Delivery_location_longitude'].to_numpy() / cell).astype('int32'),
+    })
+    keys = ['Order_Date', 'Road_traffic_density', 'cell_lat', 'cell_lon']
+    return df_aux.groupby(keys, observed=True, dropna=False).size().rename('orders').reset_index()
+
+
+def merge_geo_bins(bins):
+    """ Finalidade da função:
+        1. Juntar grades calculadas sobre partes do dataset somando os pedidos das células iguais
+        Input: lista de grades
+        Output: grade combinada, ordenada por data
+    """
+    keys = ['Order_Date', 'Road_traffic_density', 'cell_lat', 'cell_lon']
+    return pd.concat(bins, ignore_index=True).groupby(keys, observed=True, dropna=False)['orders'].sum().reset_index()
+
+
+def append_geo_bins(bins, part, offset=None):
+    """ Finalidade da função:
+        1. Acrescentar à grade a grade de um lote novo, somando os pedidos das células iguais
+        Input: grade, grade do lote, linhas antes do lote (não usado: a grade não guarda posições)
+        Output: grade combinada, ordenada por data
+    """
+    bins = merge_geo_bins([bins, part])
+    bins['Road_traffic_density'] = bins['Road_traffic_density'].astype('category')
+    return bins
+
+
+def load_geo_bins(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir a grade de entregas uma única vez por versão dos dados (cache do processo)
+        2. No modo em blocos (STREAM_CHUNK_ROWS) a grade é agregada bloco a bloco
+        3. Lotes acrescentados (curry.append) atualizam a grade com append_geo_bins
+        Input: caminho do arquivo
+        Output: Dataframe da grade (compartilhado, não deve ser alterado)
+    """
+    if STREAM_CHUNK_ROWS:
+        from curry.stream import load_streamed
+        return load_streamed(path)['geo_bins']
+
+    columns = ['Order_Date', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+    return load_derived('geo_bins', build_geo_bins, path, columns, append=append_geo_bins)
+
+
+def heat_points(bins, zoom, date_range=None, traffic_options=None, max_cells=MAX_CELLS):
+    """ Finalidade da função:
+        1. Aplicar os filtros da barra lateral sobre a grade (fatia por data + filtro de trânsito)
+        2. Agregar as células finas na grade do zoom pedido (divisão inteira por potência de 2)
+        3. Se passar de max_cells, usar a grade do zoom anterior até caber: o payload do mapa fica limitado
+        Input: grade, nível de zoom, tupla (início, fim), lista de condições de trânsito, limite de células
+        Output: Dataframe com latitude, longitude (centro da célula) e orders; nível de zoom efetivo
+    """
+    if date_range is not None:
+        start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+        dates = bins['Order_Date'].to_numpy()
+        bins = bins.iloc[np.searchsorted(dates, start, side='left'):np.searchsorted(dates, end, side='right')]
+    if traffic_options is not None:
+        bins = bins.loc[bins['Road_traffic_density'].isin(traffic_options), :]
+
+    zoom = int(np.clip(zoom, MIN_ZOOM, MAX_ZOOM))
+    while True:
+        shift = MAX_ZOOM - zoom
+        df_aux = bins.groupby([bins['cell_lat'].to_numpy() >> shift,
+                               bins['cell_lon'].to_numpy() >> shift])['orders'].sum()
+        if len(df_aux) <= max_cells or zoom == MIN_ZOOM:
+            break
+        zoom -= 1
+
+    cell = cell_degrees(zoom)
+    df_aux = df_aux.reset_index()
+    df_aux.columns = ['cell_lat', 'cell_lon', 'orders']
+    df_aux['latitude'] = (df_aux['cell_lat'] + 0.5) * cell
+    df_aux['longitude'] = (df_aux['cell_lon'] + 0.5) * cell
+    return df_aux.loc[:, ['latitude', 'longitude', 'orders']], zoom
@@ -0,0 +1,582 @@
+# Libraries
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from curry import partitions, schema
+from curry.geo import delivery_distance, restaurant_id
+from curry.memo import memoized
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:     # sem pyarrow o dataset é sempre lido do CSV
+    pa = feather = None
+
+DATA_PATH = './datasets/train.csv'
+
+# versão do formato do cache colunar: incrementar sempre que as colunas derivadas mudarem
+SCHEMA_VERSION = 8
+
+# chave do relatório de ingestão nos metadados do arquivo colunar
+REPORT_KEY = b'curry.ingest_report'
+
+# chave da extensão guardada no arquivo colunar: linhas e última Order_Date (lidas sem abrir as colunas)
+EXTENT_KEY = b'curry.extent'
+
+# chave dos metadados de um lote acrescentado (curry.append): relatório de ingestão do lote,
+# linhas guardadas antes dele (offset), se as datas dele começam depois das guardadas (ordered) e a
+# extensão do dataset com o lote (rows, last), para o próximo lote não varrer o histórico
+BATCH_KEY = b'curry.batch'
+BATCH_NAME = '{:05d}.feather'
+
+# modo em blocos: com CURRY_CHUNK_ROWS definido, o CSV é lido em blocos desse tamanho e os agregados
+# (cubo, índice temporal, grade do mapa) são montados bloco a bloco, sem o dataset inteiro em memória
+STREAM_CHUNK_ROWS = int(os.environ.get('CURRY_CHUNK_ROWS', 0)) or None
+
+# ingestão paralela: com CURRY_INGEST_WORKERS definido, o CSV é dividido em fatias limpas por esse
+# número de processos (ver curry.parallel)
+INGEST_WORKERS = int(os.environ.get('CURRY_INGEST_WORKERS', 0)) or None
+
+# cache por processo: (caminho, colunas), ('derived', nome, caminho) ou ('aggregate', nome, caminho)
+# -> (versão dos dados, objeto)
+# versão dos dados: '<versão do CSV>' ou '<versão do CSV>+<nº de lotes acrescentados>'
+_cache = {}
+# relatório de ingestão por processo: caminho do arquivo -> (versão dos dados, relatório)
+_reports = {}
+_lock = threading.RLock()
+
+# versão publicada por arquivo (curry.watcher): as sessões usam esta versão até a próxima troca
+_published = {}
+# versão em construção pela thread do watcher: cache e relatórios próprios, fora dos publicados
+_staging = threading.local()
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def clean_code(df1, report=None):
+    """ Esta função tem a finalidade de limpar e formatar o dataframe lido com schema.read_source.
+        Tipos de limpeza:
+        1. Remoção das linhas com colunas obrigatórias ausentes, data inválida ou tempo inválido
+        2. Mudança do tipo dos dados
+        3. Remoção dos espaços em branco
+        4. Formatação das colunas de tempo
+        Todas as regras são avaliadas sobre o dataframe bruto e as linhas são filtradas uma única vez.
+        Input: Dataframe bruto, report (dict opcional, preenchido com as linhas lidas/rejeitadas e os motivos)
+        Output: Dataframe
+    """
+    # Convertendo as colunas de data e de tempo (vetorizado, valores inválidos viram NaN/NaT)
+    order_date = pd.to_datetime(df1['Order_Date'], format=schema.DATE_FORMAT, errors='coerce')
+    time_taken = schema.parse_time_taken(df1['Time_taken(min)'])
+
+    # Motivos de rejeição: colunas obrigatórias ausentes e conversões que falharam
+    reasons = {col: df1[col].isna() for col in schema.REQUIRED}
+    reasons['Order_Date'] = order_date.isna()
+    reasons['Time_taken(min)'] = time_taken.isna()
+
+    rejected = np.logical_or.reduce([mask.to_numpy() for mask in reasons.values()])
+    linhas = ~rejected
+
+    if report is not None:
+        report['rows_read'] = report.get('rows_read', 0) + len(df1)
+        report['rows_rejected'] = report.get('rows_rejected', 0) + int(rejected.sum())
+        counts = report.setdefault('reasons', {})
+        for col, mask in reasons.items():
+            counts[col] = counts.get(col, 0) + int(mask.sum())
+
+    # Eliminando as linhas rejeitadas (única cópia do dataframe)
+    df1 = df1.loc[linhas, :].copy()
+
+    # Alterando o tipo para o apropriado
+    df1['Order_Date'] = order_date[linhas]
+    df1['Time_taken(min)'] = time_taken[linhas].astype('int64')
+    for col, dtype in schema.CASTS.items():
+        df1[col] = df1[col].astype(dtype)
+
+    # Removendo espaços em branco: nas colunas que viram categóricas, só nas categorias (poucos valores distintos)
+    for col in schema.STRIP_COLUMNS:
+        if col in schema.CATEGORY_COLUMNS:
+            df1[col] = _strip_categories(df1[col])
+        else:
+            df1[col] = df1[col].str.strip()
+
+    return df1
+
+
+def _strip_categories(values):
+    # categoriza a coluna e remove os espaços das categorias; categorias que ficam iguais são unidas
+    values = values.astype('category')
+    categories, inverse = np.unique(values.cat.categories.str.strip().to_numpy(dtype=object), return_inverse=True)
+    # código -1 (valor ausente) continua -1: aponta para o -1 acrescentado no final
+    codes = np.append(inverse, -1)[values.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=values.index)
+
+
+def derive_columns(df1):
+    """ Finalidade da função:
+        1. Acrescentar ao dataset limpo as colunas derivadas, calculadas uma única vez na carga
+           - Delivery_distance: distância (km) entre restaurante e local de entrega
+           - Restaurant_ID: ID inteiro do restaurante, derivado das coordenadas arredondadas
+        Input: Dataframe limpo
+        Output: Dataframe com as colunas derivadas
+    """
+    df1['Delivery_distance'] = delivery_distance(df1)
+    df1['Restaurant_ID'] = restaurant_id(df1['Restaurant_latitude'], df1['Restaurant_longitude'])
+    return df1
+
+
+def data_version(path=DATA_PATH, use_hash=False):
+    """ Finalidade da função:
+        1. Gerar uma impressão digital do arquivo de dados para invalidar o cache
+        2. Por padrão usa o mtime e o tamanho do arquivo (apenas um os.stat)
+        3. Com use_hash=True usa o hash blake2b do conteúdo, útil quando o mtime não é confiável
+        4. Lotes acrescentados ao CSV (curry.append) entram como sufixo '+<nº de lotes>'
+        Input: caminho do arquivo, use_hash
+        Output: String com a versão dos dados
+    """
+    if use_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        source = digest.hexdigest()
+    else:
+        stat = os.stat(path)
+        source = '{}-{}'.format(stat.st_mtime_ns, stat.st_size)
+
+    batches = len(glob.glob(os.path.join(appends_path(path, source), '*.feather')))
+    return '{}+{}'.format(source, batches) if batches else source
+
+
+def current_version(path=DATA_PATH, use_hash=False):
+    """ Finalidade da função:
+        1. Informar a versão dos dados que deve ser servida: na thread do watcher, a versão em construção;
+           com o watcher ativo, a versão publicada; sem watcher, a versão do arquivo (data_version)
+        Input: caminho do arquivo, use_hash
+        Output: String com a versão dos dados
+    """
+    stage = getattr(_staging, 'stage', None)
+    if stage is not None and stage['path'] == path:
+        return stage['version']
+    published = _published.get(path)
+    return published if published is not None else data_version(path, use_hash)
+
+
+def _stores():
+    # cache, relatórios e lock da versão em construção (thread do watcher) ou os publicados
+    stage = getattr(_staging, 'stage', None)
+    if stage is not None:
+        return stage['cache'], stage['reports'], stage['lock']
+    return _cache, _reports, _lock
+
+
+def stage(path, version):
+    """ Finalidade da função:
+        1. Começar a construir uma versão dos dados na thread atual: os loaders dela passam a usar essa versão
+           e a guardar o que constroem num cache à parte, sem afetar as sessões
+        2. Estruturas com append partem da versão publicada e recebem só os lotes novos
+        Input: caminho do arquivo, versão a construir
+        Output: dict da versão em construção (para publish)
+    """
+    _staging.stage = {'path': path, 'version': version, 'cache': {}, 'reports': {}, 'lock': threading.RLock()}
+    return _staging.stage
+
+
+def publish(path, version, staged=None):
+    """ Finalidade da função:
+        1. Trocar de uma vez (sob o lock do cache) a versão servida às sessões pela versão construída
+        2. Sem staged, apenas fixa a versão servida (ex.: ao iniciar o watcher)
+        Input: caminho do arquivo, versão, dict de stage (ou None)
+        Output: None
+    """
+    _staging.stage = None
+    with _lock:
+        if staged is not None:
+            _cache.update(staged['cache'])
+            _reports.update(staged['reports'])
+        _published[path] = version
+
+
+def discard_stage():
+    # abandona a versão em construção na thread atual (ex.: o arquivo mudou durante a construção)
+    _staging.stage = None
+
+
+def source_version(version):
+    # versão do CSV, sem os lotes acrescentados
+    return version.split('+', 1)[0]
+
+
+def batch_count(version):
+    # quantidade de lotes acrescentados incluídos na versão
+    return int(version.split('+', 1)[1]) if '+' in version else 0
+
+
+def columnar_path(path, version):
+    """ Finalidade da função:
+        1. Montar o caminho do arquivo colunar (Feather) ao lado do CSV de origem
+        2. O nome leva a versão do CSV, então um CSV novo nunca reaproveita um cache antigo
+           (os lotes acrescentados ficam em arquivos próprios, ver appends_path)
+        Input: caminho do CSV, versão dos dados
+        Output: String com o caminho do arquivo .feather
+    """
+    base, _ = os.path.splitext(path)
+    return '{}.{}.v{}.feather'.format(base, source_version(version), SCHEMA_VERSION)
+
+
+def appends_path(path, version):
+    """ Finalidade da função:
+        1. Montar o caminho da pasta dos lotes acrescentados ao CSV (um Feather limpo por lote)
+        2. O nome leva a versão do CSV: trocar o CSV descarta os lotes acrescentados ao anterior
+        Input: caminho do CSV, versão dos dados
+        Output: String com o caminho da pasta .appends
+    """
+    base, _ = os.path.splitext(path)
+    return '{}.{}.v{}.appends'.format(base, source_version(version), SCHEMA_VERSION)
+
+
+def batch_files(path, version):
+    """ Finalidade da função:
+        1. Listar, em ordem, os arquivos dos lotes acrescentados incluídos na versão dos dados
+        Input: caminho do CSV, versão dos dados
+        Output: lista de caminhos
+    """
+    root = appends_path(path, version)
+    return [os.path.join(root, BATCH_NAME.format(k)) for k in range(1, batch_count(version) + 1)]
+
+
+def read_batch(file, columns=None):
+    """ Finalidade da função:
+        1. Ler via memory-map um lote acrescentado (já limpo) e os seus metadados
+        Input: caminho do arquivo do lote, lista de colunas (None = todas)
+        Output: Dataframe do lote; dict com report, offset e ordered
+    """
+    table = feather.read_table(file, columns=columns, memory_map=True)
+    meta = json.loads((table.schema.metadata or {})[BATCH_KEY])
+    return table.to_pandas(types_mapper=_types_mapper), meta
+
+
+def pending_batches(path, cached_version, version, columns=None, ordered=True):
+    """ Finalidade da função:
+        1. Ler os lotes que a versão atual tem a mais que a versão de uma estrutura em cache,
+           para atualizá-la sem reconstruir
+        2. Devolve None quando a atualização incremental não vale: CSV trocado ou, com ordered=True,
+           algum lote com datas anteriores às guardadas (as posições das linhas mudam)
+        Input: caminho do CSV, versão da estrutura em cache, versão atual, lista de colunas, ordered
+        Output: lista de (Dataframe do lote, metadados) ou None
+    """
+    if source_version(cached_version) != source_version(version) or batch_count(cached_version) > batch_count(version):
+        return None
+
+    batches = [read_batch(file, columns) for file in batch_files(path, version)[batch_count(cached_version):]]
+    if ordered and not all(meta['ordered'] for _, meta in batches):
+        return None
+    return batches
+
+
+def partitions_path(path, version):
+    """ Finalidade da função:
+        1. Montar o caminho da pasta do layout particionado (mês × cidade × trânsito) ao lado do CSV
+        2. O nome leva a versão dos dados completa (com os lotes acrescentados): cada versão tem o seu layout
+        Input: caminho do CSV, versão dos dados
+        Output: String com o caminho da pasta .parts
+    """
+    base, _ = os.path.splitext(path)
+    return '{}.{}.v{}.parts'.format(base, version, SCHEMA_VERSION)
+
+
+def extent(df1, previous=None):
+    """ Finalidade da função:
+        1. Resumir a extensão do dataset guardado: quantidade de linhas e última Order_Date (ISO, None sem linhas)
+        2. Com previous, soma o Dataframe (um lote) à extensão anterior
+        Input: Dataframe limpo, extensão anterior (dict ou None)
+        Output: dict com rows e last
+    """
+    rows, last = (0, None) if previous is None else (previous['rows'], previous['last'])
+    if len(df1):
+        batch_last = pd.Timestamp(df1['Order_Date'].max())
+        last = batch_last if last is None else max(pd.Timestamp(last), batch_last)
+    return {'rows': rows + len(df1), 'last': None if last is None else pd.Timestamp(last).isoformat()}
+
+
+def materialize(df1, path, version, report):
+    """ Finalidade da função:
+        1. Gravar o dataset limpo em formato Feather sem compressão (permite memory-map)
+        2. Guardar nos metadados do arquivo o relatório de ingestão e a extensão (linhas e última Order_Date)
+        3. Gravar em arquivo temporário e renomear, para que leitores nunca vejam um arquivo pela metade
+        4. Apagar os arquivos colunares, os lotes acrescentados e as partições de versões anteriores do mesmo CSV
+        Input: Dataframe limpo, caminho do CSV, versão dos dados, relatório de ingestão
+        Output: None
+    """
+    if feather is None:
+        return
+
+    table = pa.Table.from_pandas(df1, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[REPORT_KEY] = json.dumps(report).encode()
+    metadata[EXTENT_KEY] = json.dumps(extent(df1)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    target = columnar_path(path, version)
+    tmp = '{}.{}.tmp'.format(target, os.getpid())
+    feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, target)
+
+    remove_stale(path, 'feather', target)
+    remove_stale(path, 'appends', appends_path(path, version))
+    remove_stale(path, 'parts', partitions_path(path, version))
+
+
+def remove_stale(path, kind, keep):
+    """ Finalidade da função:
+        1. Apagar os arquivos ('feather') ou as pastas ('parts', 'appends') de outras versões do mesmo CSV
+        2. Os da versão publicada pelo watcher ficam: as sessões continuam nela até a troca
+        3. Leitores que ainda usam uma versão antiga via memory-map continuam lendo os arquivos apagados
+        Input: caminho do CSV, tipo ('feather', 'parts' ou 'appends'), caminho a manter
+        Output: None
+    """
+    kept = {keep}
+    published = _published.get(path)
+    if published is not None:
+        kept.add({'feather': columnar_path, 'parts': partitions_path, 'appends': appends_path}[kind](path, published))
+
+    base, _ = os.path.splitext(path)
+    for old in glob.glob('{}.*.{}'.format(base, kind)):
+        if old in kept:
+            continue
+        if os.path.isdir(old):
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def _types_mapper(arrow_type):
+    # strings Arrow voltam como string[pyarrow] (mantém o ID do pedido compacto depois da leitura)
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+def read_clean(path, version, columns=None):
+    """ Finalidade da função:
+        1. Ler o dataset limpo do arquivo colunar, se existir, via memory-map e só com as colunas pedidas
+        2. Caso contrário, ler o CSV pelo esquema, limpar, calcular as colunas derivadas, compactar
+           os tipos, ordenar por Order_Date e materializar o arquivo colunar para as próximas execuções
+        3. Com INGEST_WORKERS, a leitura e a limpeza são feitas em paralelo por fatias do CSV
+        4. Juntar os lotes acrescentados incluídos na versão (reordenando por data se algum lote for
+           anterior às datas guardadas)
+        5. Gravar o layout particionado da versão (curry.partitions), se ainda não existir
+        Input: caminho do CSV, versão dos dados, lista de colunas (None = todas)
+        Output: Dataframe limpo, relatório de ingestão
+    """
+    target = columnar_path(path, version)
+    root = partitions_path(path, version)
+    batches = batch_files(path, version)
+    ordered = all(read_batch(file, [])[1]['ordered'] for file in batches)
+
+    # sem o layout particionado (ou com lotes fora de ordem), a leitura é completa
+    wanted = columns if (feather is None or os.path.isdir(root)) and ordered else None
+
+    if feather is not None and os.path.exists(target):
+        table = feather.read_table(target, columns=wanted, memory_map=True)
+        report = json.loads((table.schema.metadata or {}).get(REPORT_KEY, b'{}'))
+        df1 = table.to_pandas(types_mapper=_types_mapper)
+    else:
+        if INGEST_WORKERS:
+            from curry.parallel import parallel_clean
+            df1, report = parallel_clean(path, INGEST_WORKERS)
+        else:
+            report = {}
+            df1 = schema.compact(derive_columns(clean_code(schema.read_source(path), report)))
+        # ordenado por data: janelas de datas viram fatias contíguas de linhas (ver curry.timeindex)
+        df1 = df1.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+        materialize(df1, path, version, report)
+
+    if batches:
+        from curry.parallel import merge_reports
+        parts = [read_batch(file, wanted) for file in batches]
+        df1 = schema.compact(pd.concat([df1] + [df_aux for df_aux, _ in parts], ignore_index=True))
+        if not ordered:
+            df1 = df1.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+        report = merge_reports([report] + [meta['report'] for _, meta in parts])
+
+    if feather is not None and not os.path.isdir(root):
+        partitions.write_partitions(df1, root)
+        remove_stale(path, 'parts', root)
+
+    if columns is not None:
+        df1 = df1.loc[:, columns]
+    return df1, report
+
+
+def load_dataset(path=DATA_PATH, columns=None, use_hash=False):
+    """ Finalidade da função:
+        1. Ler e limpar o dataset uma única vez por processo
+        2. Reutilizar o resultado enquanto a versão servida (current_version) não mudar
+        3. Ler apenas as colunas pedidas pela página (columns), quando houver cache colunar
+        4. Devolver uma cópia rasa: as páginas podem criar colunas sem afetar o cache,
+           mas não devem alterar valores in-place
+        Input: caminho do arquivo, lista de colunas, use_hash
+        Output: Dataframe limpo
+    """
+    version = current_version(path, use_hash)
+    key = (path, None if columns is None else tuple(columns))
+
+    cache, reports, lock = _stores()
+    with lock:
+        cached = cache.get(key)
+        if cached is None or cached[0] != version:
+            df1, report = read_clean(path, version, columns)
+            cached = (version, df1)
+            cache[key] = cached
+            reports[path] = (version, report)
+
+    return cached[1].copy(deep=False)
+
+
+def load_window(date_range, traffic_options, path=DATA_PATH, columns=None, use_hash=False):
+    """ Finalidade da função:
+        1. Ler apenas as linhas dos filtros da barra lateral: só as partições (mês × cidade × trânsito)
+           do período e das condições de trânsito escolhidas são abertas, e só com as colunas pedidas
+        2. Cortar as datas exatas do período (os meses das pontas são lidos inteiros)
+        3. O resultado é igual a filtrar o dataset inteiro (mesma ordem e mesmo índice) e fica no cache
+           de resultados (curry.memo) pelo estado dos filtros
+        4. Sem o layout particionado (sem pyarrow), filtra o dataset inteiro de load_dataset
+        Input: tupla (início, fim) inclusiva, lista de condições de trânsito, caminho do arquivo,
+               lista de colunas (None = todas), use_hash
+        Output: Dataframe filtrado
+    """
+    version = current_version(path, use_hash)
+    root = partitions_path(path, version)
+    if feather is not None and not os.path.isdir(root):
+        _, reports, lock = _stores()
+        with lock:
+            if not os.path.isdir(root):
+                # a leitura completa da versão grava o layout particionado
+                reports[path] = (version, read_clean(path, version, columns=[])[1])
+
+    start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+    traffic_options = sorted(traffic_options)
+    state = (path, version, None if columns is None else tuple(columns), start, end, tuple(traffic_options))
+    return memoized('window', state, _read_window, root, start, end, traffic_options, path, columns, use_hash).copy(deep=False)
+
+
+def _read_window(root, start, end, traffic_options, path, columns, use_hash):
+    # colunas lidas: as pedidas mais as usadas no corte exato do período e do trânsito
+    wanted = None if columns is None else list(dict.fromkeys(list(columns) + ['Order_Date', 'Road_traffic_density']))
+
+    files = []
+    if os.path.isdir(root):
+        available = partitions.list_partitions(root)
+        # sem partição escolhida, uma partição qualquer dá as colunas e os tipos do resultado vazio
+        files = partitions.select_partitions(available, (start, end), traffic_options) or available['file'].tolist()[:1]
+    if files:
+        df1 = partitions.read_partitions(files, wanted, _types_mapper)
+    else:
+        df1 = load_dataset(path, wanted, use_hash)
+
+    dates = df1['Order_Date'].to_numpy()
+    linhas = (dates >= start) & (dates <= end) & df1['Road_traffic_density'].isin(traffic_options).to_numpy()
+    df1 = df1.loc[linhas, :]
+    return df1 if columns is None else df1.loc[:, list(columns)]
+
+
+def load_derived(name, builder, path=DATA_PATH, columns=None, use_hash=False, append=None):
+    """ Finalidade da função:
+        1. Construir uma estrutura derivada do dataset (cubo, índices, tabelas agregadas) uma única vez
+           por versão dos dados e reaproveitá-la em todos os reruns e sessões do processo
+        2. builder recebe o Dataframe limpo (apenas com as colunas pedidas) e devolve a estrutura
+        3. Com o arquivo colunar disponível, o dataset é lido só para o builder e não fica no cache
+        4. Com append, uma versão que só acrescentou lotes em ordem de data (curry.append) atualiza a estrutura
+           em cache com append(estrutura, builder(lote), linhas antes do lote), sem reler o histórico
+        5. O resultado é compartilhado: quem o recebe não deve alterá-lo
+        Input: nome da estrutura, função builder, caminho do arquivo, lista de colunas, use_hash, append
+        Output: objeto devolvido por builder
+    """
+    version = current_version(path, use_hash)
+    key = ('derived', name, path)
+
+    cache, _, lock = _stores()
+    with lock:
+        cached = cache.get(key)
+        if cached is None or cached[0] != version:
+            # versão em construção pelo watcher: parte da estrutura publicada
+            previous = cached or _cache.get(key)
+            batches = None
+            if append is not None and previous is not None:
+                batches = pending_batches(path, previous[0], version, columns)
+
+            if batches is not None:
+                obj = previous[1]
+                for batch, meta in batches:
+                    obj = append(obj, builder(batch), meta['offset'])
+            elif feather is not None and os.path.exists(columnar_path(path, version)):
+                obj = builder(read_clean(path, version, columns)[0])
+            else:
+                obj = builder(load_dataset(path, columns, use_hash))
+            cached = (version, obj)
+            cache[key] = cached
+
+    return cached[1]
+
+
+def load_aggregate(name, builder, path=DATA_PATH, use_hash=False, append=None):
+    """ Finalidade da função:
+        1. Como load_derived, mas builder recebe o caminho do arquivo e lê a fonte por conta própria
+           (ex.: agregação em blocos), sem passar pelo dataset limpo em memória
+        2. builder lê só o CSV: os lotes acrescentados (curry.append) entram com append(agregado, lote, relatório
+           do lote), na construção e quando uma nova versão só acrescentou lotes
+        Input: nome do agregado, função builder, caminho do arquivo, use_hash, append
+        Output: objeto devolvido por builder
+    """
+    version = current_version(path, use_hash)
+    key = ('aggregate', name, path)
+
+    cache, _, lock = _stores()
+    with lock:
+        cached = cache.get(key)
+        if cached is None or cached[0] != version:
+            # versão em construção pelo watcher: parte da estrutura publicada
+            previous = cached or _cache.get(key)
+            batches = None
+            if append is not None and previous is not None:
+                batches = pending_batches(path, previous[0], version, ordered=False)
+
+            if batches is not None:
+                obj = previous[1]
+            else:
+                obj = builder(path)
+                batches = [read_batch(file) for file in batch_files(path, version)] if append is not None else []
+            for batch, meta in batches:
+                obj = append(obj, batch, meta['report'])
+            cached = (version, obj)
+            cache[key] = cached
+
+    return cached[1]
+
+
+def ingest_report(path=DATA_PATH, use_hash=False):
+    """ Finalidade da função:
+        1. Informar quantas linhas foram lidas e rejeitadas na ingestão da versão atual dos dados
+        2. reasons conta, por regra (coluna obrigatória ausente, data ou tempo inválido), as linhas
+           que falharam nela; uma linha pode falhar em mais de uma regra
+        Input: caminho do arquivo, use_hash
+        Output: dict com rows_read, rows_rejected e reasons
+    """
+    version = current_version(path, use_hash)
+    _, reports, _ = _stores()
+    cached = reports.get(path)
+    if cached is None or cached[0] != version:
+        load_dataset(path, columns=[], use_hash=use_hash)
+        cached = reports[path]
+    return dict(cached[1])
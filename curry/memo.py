@@ -0,0 +1,98 @@
+# Libraries
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# tamanho máximo (estimado) de todos os resultados guardados; os menos usados saem primeiro
+MAX_BYTES = 64 * 1024 * 1024
+
+# cache de resultados por processo: (nome, estado dos filtros) -> (tamanho estimado, resultado),
+# em ordem de uso (o último é o mais recente)
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+_lock = threading.RLock()
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def result_size(obj):
+    """ Finalidade da função:
+        1. Estimar a memória ocupada por um resultado (Dataframe, Series, array, figura ou estruturas deles)
+        2. Figuras do plotly são medidas pelos dados dos traces (to_plotly_json), sem serializar para JSON
+        Input: objeto
+        Output: int com o tamanho em bytes
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        size = obj.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(obj, pd.DataFrame) else int(size)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, 'to_plotly_json'):
+        return result_size(obj.to_plotly_json())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(result_size(k) + result_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(result_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def memoized(name, state, builder, *args, **kwargs):
+    """ Finalidade da função:
+        1. Devolver o resultado guardado para (name, state) ou calculá-lo com builder(*args, **kwargs)
+        2. Contar acertos e faltas; ao passar de MAX_BYTES, descartar os resultados usados há mais tempo
+        state deve identificar tudo de que o resultado depende: versão dos dados, período, condições de
+        trânsito e parâmetros extras do painel (ex.: critério do ranking)
+        Input: nome do gráfico/tabela, estado (tupla hashable), função que calcula o resultado e seus argumentos
+        Output: resultado (compartilhado entre as sessões, não deve ser alterado)
+    """
+    key = (name, state)
+    with _lock:
+        cached = _entries.get(key)
+        if cached is not None:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return cached[1]
+        _stats['misses'] += 1
+
+    # o cálculo roda fora do lock: outras sessões continuam sendo atendidas pelo cache
+    result = builder(*args, **kwargs)
+    size = result_size(result)
+    if size > MAX_BYTES:
+        return result
+
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _stats['bytes'] -= previous[0]
+        _entries[key] = (size, result)
+        _stats['bytes'] += size
+        while _stats['bytes'] > MAX_BYTES:
+            _, (evicted, _) = _entries.popitem(last=False)
+            _stats['bytes'] -= evicted
+            _stats['evictions'] += 1
+    return result
+
+
+def cache_stats():
+    """ Finalidade da função:
+        1. Informar o estado do cache de resultados
+        Input: None
+        Output: dict com hits, misses, evictions, bytes e entries
+    """
+    with _lock:
+        return dict(_stats, entries=len(_entries))
+
+
+def clear():
+    """ Finalidade da função:
+        1. Esvaziar o cache de resultados e zerar os contadores
+        Input: None
+        Output: None
+    """
+    with _lock:
+        _entries.clear()
+        _stats.update(hits=0, misses=0, evictions=0, bytes=0)
@@ -0,0 +1,76 @@
+# Libraries
+import numpy as np
+
+from curry.cube import rollup
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def traffic_share(cube):
+    """ Finalidade da função:
+        1. Quantidade de entregas por densidade de tráfego e sua participação no total (cubo já filtrado)
+        Input: cubo
+        Output: Dataframe com Road_traffic_density, ID (entregas) e relative_deliv
+    """
+    df_aux = rollup(cube, ['Road_traffic_density']).rename(columns={'orders': 'ID'})
+    df_aux['relative_deliv'] = df_aux['ID'] / (df_aux['ID'].sum())
+    return df_aux.loc[:, ['Road_traffic_density', 'ID', 'relative_deliv']]
+
+
+def city_traffic_orders(cube):
+    """ Finalidade da função:
+        1. Quantidade de entregas por cidade e por densidade de tráfego (cubo já filtrado)
+        Input: cubo
+        Output: Dataframe com City, Road_traffic_density e ID (entregas)
+    """
+    df_aux = rollup(cube, ['City', 'Road_traffic_density']).rename(columns={'orders': 'ID'})
+    return df_aux.loc[:, ['City', 'Road_traffic_density', 'ID']]
+
+
+def city_centroids(df1):
+    """ Finalidade da função:
+        1. Mediana das latitudes e longitudes dos locais de entrega (ponto central) de cada cidade, por tráfego
+        Input: Dataframe com City, Road_traffic_density e as coordenadas de entrega
+        Output: Dataframe com City, Road_traffic_density, Delivery_location_latitude e Delivery_location_longitude
+    """
+    cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+    return df1.loc[:, cols].groupby(['City', 'Road_traffic_density'], observed=True).median().reset_index()
+
+
+def unique_couriers(df1):
+    """ Finalidade da função:
+        1. Quantidade de entregadores distintos
+        Input: Dataframe
+        Output: int
+    """
+    return len(df1.loc[:, 'Delivery_person_ID'].unique())
+
+
+def mean_distance(df1):
+    """ Finalidade da função:
+        1. Distância média entre restaurante e local de entrega (coluna Delivery_distance), com 2 casas
+        Input: Dataframe
+        Output: float
+    """
+    return np.round(df1['Delivery_distance'].mean(), 2)
+
+
+def mean_distance_by_city(df1):
+    """ Finalidade da função:
+        1. Distância média entre restaurante e local de entrega em cada cidade
+        Input: Dataframe
+        Output: Dataframe com City e Delivery_distance
+    """
+    return df1.loc[:, ['City', 'Delivery_distance']].groupby(['City'], observed=True).mean().reset_index()
+
+
+def festival_delivery_time(cube, statistics, festival):
+    """ Finalidade da função:
+        1. Tempo médio ou desvio padrão do tempo de entrega dentro ou fora do festival (cubo já filtrado)
+        Input: cubo, 'mean_delivery_time' ou 'std_delivery_time', 'Yes' ou 'No'
+        Output: Series com o valor arredondado em 2 casas
+    """
+    lines = cube['Festival'] == festival
+    df_aux = rollup(cube.loc[lines, :], ['Festival'])
+    return np.round(df_aux[statistics], 2)
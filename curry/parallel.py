@@ -0,0 +1,121 @@
+# Libraries
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from curry import schema
+from curry.loader import clean_code, derive_columns
+
+# tamanho alvo de cada fatia do CSV entregue a um processo
+SHARD_BYTES = 64 * 1024 * 1024
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def byte_shards(path, shards):
+    """ Finalidade da função:
+        1. Dividir o CSV em fatias de bytes de tamanho parecido, sempre começando no início de uma linha
+        2. O cabeçalho fica de fora: as fatias contêm apenas linhas de dados
+        Input: caminho do CSV, quantidade de fatias
+        Output: lista de colunas do cabeçalho; lista de tuplas (início, fim) em bytes
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        first = f.tell()
+
+        bounds = [first]
+        for k in range(1, shards):
+            f.seek(max(first + (size - first) * k // shards - 1, bounds[-1]))
+            f.readline()                    # avança até o fim da linha em que caiu
+            bounds.append(max(f.tell(), bounds[-1]))
+        bounds.append(size)
+
+    names = header.decode('utf-8').rstrip('\r\n').split(',')
+    return names, [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def read_shard(path, names, start, end):
+    """ Finalidade da função:
+        1. Ler uma fatia de bytes do CSV com o esquema de ingestão (schema.read_source)
+        Input: caminho do CSV, colunas do cabeçalho, início e fim da fatia em bytes
+        Output: Dataframe bruto
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return schema.read_source(io.BytesIO(data), header=None, names=names)
+
+
+def _clean_shard(task):
+    # processo de trabalho: lê, limpa, deriva e compacta uma fatia; devolve colunas tipadas e o relatório
+    path, names, start, end = task
+    report = {}
+    df1 = schema.compact(derive_columns(clean_code(read_shard(path, names, start, end), report)))
+    return df1, report
+
+
+def _aggregate_shard(task):
+    # processo de trabalho: agrega uma fatia limpa com cada função de aggregates
+    path, names, start, end, aggregates = task
+    report = {}
+    df1 = schema.compact(clean_code(read_shard(path, names, start, end), report))
+    return {name: build(df1) for name, (build, merge) in aggregates.items()}, report
+
+
+def merge_reports(reports):
+    """ Finalidade da função:
+        1. Somar os relatórios de ingestão de várias fatias
+        Input: lista de relatórios
+        Output: relatório combinado
+    """
+    merged = {'rows_read': 0, 'rows_rejected': 0, 'reasons': {}}
+    for report in reports:
+        merged['rows_read'] += report.get('rows_read', 0)
+        merged['rows_rejected'] += report.get('rows_rejected', 0)
+        for col, count in report.get('reasons', {}).items():
+            merged['reasons'][col] = merged['reasons'].get(col, 0) + count
+    return merged
+
+
+def _tasks(path, workers, shard_bytes):
+    # fatias suficientes para ocupar todos os processos e para nenhuma passar de shard_bytes
+    shards = max(workers, -(-os.path.getsize(path) // shard_bytes))
+    names, bounds = byte_shards(path, shards)
+    return [(path, names, start, end) for start, end in bounds]
+
+
+def parallel_clean(path, workers=None, shard_bytes=SHARD_BYTES):
+    """ Finalidade da função:
+        1. Limpar o CSV em paralelo: cada processo lê uma fatia de bytes e aplica clean_code,
+           derive_columns e schema.compact (mesmo resultado da leitura serial)
+        2. As fatias voltam na ordem do arquivo e são concatenadas; as categóricas são refeitas no final,
+           porque cada fatia tem as suas próprias categorias
+        Input: caminho do CSV, quantidade de processos (None = todos os núcleos), tamanho alvo das fatias
+        Output: Dataframe limpo (ordem do arquivo); relatório de ingestão
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_clean_shard, _tasks(path, workers, shard_bytes)))
+
+    df1 = pd.concat([df_aux for df_aux, _ in results], ignore_index=True)
+    return schema.compact(df1), merge_reports([report for _, report in results])
+
+
+def parallel_fold(path, aggregates, workers=None, shard_bytes=SHARD_BYTES):
+    """ Finalidade da função:
+        1. Agregar o CSV em paralelo: cada processo limpa uma fatia e devolve só os agregados dela
+        2. O processo principal junta os agregados com a função de junção de cada um
+        Input: caminho do CSV, dict nome -> (agregação, junção), quantidade de processos, tamanho das fatias
+        Output: dict nome -> agregado final; relatório de ingestão
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [task + (aggregates,) for task in _tasks(path, workers, shard_bytes)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_aggregate_shard, tasks))
+
+    folded = {name: merge([parts[name] for parts, _ in results]) for name, (build, merge) in aggregates.items()}
+    return folded, merge_reports([report for _, report in results])
@@ -0,0 +1,168 @@
+# Libraries
+import os
+import shutil
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:     # sem pyarrow não há layout particionado (o loader filtra o dataset inteiro)
+    pa = feather = None
+
+# chaves das partições, na ordem dos diretórios: mês de Order_Date × cidade × condição de trânsito
+PARTITION_KEYS = ['month', 'City', 'Road_traffic_density']
+
+# posição da linha no dataset completo (ordenado por data): restaura a ordem ao juntar partições
+POSITION_COLUMN = '_position'
+
+PART_FILE = 'part.feather'
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def write_partitions(df1, root):
+    """ Finalidade da função:
+        1. Gravar o dataset limpo em partições mês × City × Road_traffic_density, uma pasta por
+           combinação no formato chave=valor (ex.: month=2022-03/City=Urban/Road_traffic_density=Jam)
+        2. Cada partição é um Feather sem compressão (memory-map) com a coluna POSITION_COLUMN
+        3. Gravar numa pasta temporária e renomear, para que leitores nunca vejam o layout pela metade
+        Input: Dataframe limpo e ordenado por Order_Date, pasta raiz das partições
+        Output: None
+    """
+    if feather is None:
+        return
+
+    tmp = '{}.{}.tmp'.format(root, os.getpid())
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    # conversão para Arrow uma única vez; cada partição é um take das suas posições
+    table = pa.Table.from_pandas(df1, preserve_index=False)
+    for folder, positions in _groups(df1):
+        os.makedirs(os.path.join(tmp, folder))
+        positions = pa.array(positions.astype('int64'))
+        part = table.take(positions).append_column(POSITION_COLUMN, positions)
+        feather.write_feather(part, os.path.join(tmp, folder, PART_FILE), compression='uncompressed')
+
+    try:
+        os.replace(tmp, root)
+    except OSError:     # outro processo já gravou o layout desta versão
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def append_partitions(df1, root, target, offset):
+    """ Finalidade da função:
+        1. Montar o layout de uma nova versão dos dados a partir do layout root e de um lote acrescentado
+        2. As partições que o lote não toca entram por hard link (sem copiar dados); as que ele toca são
+           regravadas com as linhas do lote no final, nas posições offset, offset + 1, ...
+        3. As partições do lote seguem o esquema do layout existente; se os tipos não couberem,
+           nada é gravado e o layout da nova versão é montado depois a partir do dataset completo
+        Input: Dataframe do lote (limpo e ordenado por data), pasta do layout atual, pasta do novo layout,
+               linhas do dataset antes do lote
+        Output: True se o novo layout foi gravado
+    """
+    tmp = '{}.{}.tmp'.format(target, os.getpid())
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    reference = None
+    for dirpath, _, filenames in os.walk(root):
+        if PART_FILE in filenames:
+            os.makedirs(os.path.join(tmp, os.path.relpath(dirpath, root)))
+            _link(os.path.join(dirpath, PART_FILE), os.path.join(tmp, os.path.relpath(dirpath, root), PART_FILE))
+            reference = reference or feather.read_table(os.path.join(dirpath, PART_FILE), memory_map=True).schema
+
+    try:
+        for folder, positions in _groups(df1):
+            file = os.path.join(tmp, folder, PART_FILE)
+            df_aux = df1.iloc[positions].assign(**{POSITION_COLUMN: positions.astype('int64') + offset})
+            part = pa.Table.from_pandas(df_aux, preserve_index=False)
+            if reference is not None:
+                part = part.select(reference.names).cast(reference)
+            if os.path.exists(file):
+                part = pa.concat_tables([feather.read_table(file, memory_map=True), part])
+            else:
+                os.makedirs(os.path.dirname(file), exist_ok=True)
+            # grava ao lado e renomeia: o arquivo antigo é um hard link do layout atual e não pode ser alterado
+            feather.write_feather(part, file + '.new', compression='uncompressed')
+            os.replace(file + '.new', file)
+    except (pa.ArrowException, KeyError):
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+
+    try:
+        os.replace(tmp, target)
+    except OSError:     # outro processo já gravou o layout desta versão
+        shutil.rmtree(tmp, ignore_errors=True)
+    return True
+
+
+def _groups(df1):
+    # pasta (relativa) de cada partição do Dataframe e as posições das suas linhas
+    months = df1['Order_Date'].to_numpy().astype('datetime64[M]')
+    groups = df1.groupby([months, df1['City'], df1['Road_traffic_density']], observed=True, sort=True).indices
+    for (month, city, traffic), positions in groups.items():
+        folder = os.path.join(*('{}={}'.format(key, quote(str(value), safe=''))
+                                for key, value in zip(PARTITION_KEYS, [np.datetime64(month, 'M'), city, traffic])))
+        yield folder, positions
+
+
+def _link(source, target):
+    # hard link quando o sistema de arquivos permite; senão, cópia
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def list_partitions(root):
+    """ Finalidade da função:
+        1. Listar as partições gravadas a partir dos nomes das pastas (sem abrir nenhum arquivo)
+        Input: pasta raiz das partições
+        Output: Dataframe com month (datetime64[M]), City, Road_traffic_density e file
+    """
+    rows = []
+    for dirpath, _, filenames in os.walk(root):
+        if PART_FILE not in filenames:
+            continue
+        parts = os.path.relpath(dirpath, root).split(os.sep)
+        values = dict(unquote(part).split('=', 1) for part in parts)
+        rows.append([values[key] for key in PARTITION_KEYS] + [os.path.join(dirpath, PART_FILE)])
+
+    df_aux = pd.DataFrame(rows, columns=PARTITION_KEYS + ['file'])
+    df_aux['month'] = df_aux['month'].to_numpy().astype('datetime64[M]')
+    return df_aux.sort_values(PARTITION_KEYS, ignore_index=True)
+
+
+def select_partitions(partitions, date_range, traffic_options):
+    """ Finalidade da função:
+        1. Escolher as partições que podem ter linhas do período e das condições de trânsito (predicate pushdown)
+        2. Os meses das pontas entram inteiros: o corte exato por data é feito depois da leitura
+        Input: Dataframe das partições, tupla (início, fim) inclusiva, lista de condições de trânsito
+        Output: lista de arquivos, em ordem de mês
+    """
+    start, end = (np.datetime64(pd.Timestamp(d), 'M') for d in date_range)
+    months = partitions['month'].to_numpy()
+    linhas = (months >= start) & (months <= end) & partitions['Road_traffic_density'].isin(traffic_options).to_numpy()
+    return partitions.loc[linhas, 'file'].tolist()
+
+
+def read_partitions(files, columns=None, types_mapper=None):
+    """ Finalidade da função:
+        1. Ler via memory-map apenas as colunas pedidas dos arquivos escolhidos e juntá-los
+        2. Restaurar a ordem do dataset completo (por POSITION_COLUMN), que também vira o índice:
+           o resultado é igual ao recorte das mesmas linhas do dataset inteiro
+        Input: lista de arquivos (ao menos um), lista de colunas (None = todas), types_mapper do to_pandas
+        Output: Dataframe com as linhas das partições
+    """
+    wanted = None if columns is None else list(columns) + [POSITION_COLUMN]
+    tables = [feather.read_table(f, columns=wanted, memory_map=True) for f in files]
+    df1 = pa.concat_tables(tables).to_pandas(types_mapper=types_mapper)
+
+    positions = df1.pop(POSITION_COLUMN).to_numpy()
+    order = np.argsort(positions, kind='stable')
+    df1 = df1.iloc[order]
+    df1.index = pd.Index(positions[order])
+    return df1
@@ -0,0 +1,42 @@
+# Libraries
+import pandas as pd
+
+# métricas de ranking: nome -> (coluna de origem, agregação por entregador)
+METRICS = {
+    'max': ('Time_taken(min)', 'max'),
+    'mean': ('Time_taken(min)', 'mean'),
+    'median': ('Time_taken(min)', 'median'),
+    'rating': ('Delivery_person_Ratings', 'mean'),
+}
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def top_couriers(df1, k=10, metric='max', ascending=True, cities=None):
+    """ Finalidade da função:
+        1. Agregar a métrica escolhida por cidade e entregador
+        2. Selecionar os k entregadores de cada cidade com seleção parcial por grupo (nsmallest/nlargest),
+           sem ordenar a tabela inteira
+        Input: Dataframe, k, métrica (chave de METRICS), ascending (True = menores valores primeiro),
+               lista de cidades (None = todas as cidades presentes)
+        Output: Dataframe com City, Delivery_person_ID e a coluna da métrica, ordenado por cidade e métrica
+    """
+    if metric not in METRICS:
+        raise ValueError('metric deve ser uma de {}'.format(sorted(METRICS)))
+    col, agg = METRICS[metric]
+
+    df_aux = df1.loc[:, ['City', 'Delivery_person_ID', col]]
+    if cities is not None:
+        df_aux = df_aux.loc[df_aux['City'].isin(cities), :]
+
+    # uma linha por (cidade, entregador)
+    df_aux = df_aux.groupby(['City', 'Delivery_person_ID'], observed=True)[col].agg(agg).dropna()
+
+    # k melhores de cada cidade por seleção parcial (poucas cidades, muitos entregadores)
+    frames = []
+    for _, values in df_aux.groupby(level='City', observed=True):
+        frames.append(values.nsmallest(k) if ascending else values.nlargest(k))
+    top = pd.concat(frames) if frames else df_aux.iloc[:0]
+
+    return top.reset_index()
@@ -0,0 +1,70 @@
+# Libraries
+from curry.loader import DATA_PATH, load_derived
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def build_restaurant_table(df1):
+    """ Finalidade da função:
+        1. Agregar os pedidos por restaurante (Restaurant_ID, derivado das coordenadas na carga)
+        2. Guardar coordenadas, cidade principal, pedidos, média e desvio padrão do tempo de entrega,
+           distância média e a fração de pedidos feitos durante o Festival
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por restaurante, indexado por Restaurant_ID
+    """
+    # coordenadas de volta em float64 arredondado (em float32 exibem ruído de arredondamento)
+    df_aux = df1.assign(
+        Restaurant_latitude=df1['Restaurant_latitude'].astype('float64').round(6),
+        Restaurant_longitude=df1['Restaurant_longitude'].astype('float64').round(6),
+        time=df1['Time_taken(min)'].astype('float64'),
+        distance=df1['Delivery_distance'].astype('float64'),
+        festival=(df1['Festival'] == 'Yes').astype('float64'),
+    )
+    table = df_aux.groupby('Restaurant_ID').agg(
+        Restaurant_latitude=('Restaurant_latitude', 'first'),
+        Restaurant_longitude=('Restaurant_longitude', 'first'),
+        orders=('time', 'size'),
+        mean_delivery_time=('time', 'mean'),
+        std_delivery_time=('time', 'std'),
+        mean_distance_km=('distance', 'mean'),
+        festival_share=('festival', 'mean'),
+    )
+
+    # cidade com mais pedidos de cada restaurante
+    city = df1.groupby(['Restaurant_ID', 'City'], observed=True).size().rename('n').reset_index()
+    city = city.sort_values('n', ascending=False, kind='mergesort').drop_duplicates('Restaurant_ID')
+    table.insert(2, 'City', city.set_index('Restaurant_ID')['City'].reindex(table.index))
+    return table
+
+
+def load_restaurant_table(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir a tabela de restaurantes uma única vez por versão dos dados (cache do processo)
+        Input: caminho do arquivo
+        Output: Dataframe da tabela de restaurantes (compartilhado, não deve ser alterado)
+    """
+    columns = ['Restaurant_ID', 'Restaurant_latitude', 'Restaurant_longitude', 'City', 'Festival',
+               'Time_taken(min)', 'Delivery_distance']
+    return load_derived('restaurant_table', build_restaurant_table, path, columns)
+
+
+def search_restaurants(table, query='', city=None, sort_by='orders', ascending=False, limit=50):
+    """ Finalidade da função:
+        1. Buscar restaurantes na tabela pré-agregada (sem reagrupar os pedidos)
+        2. query filtra pelo início do Restaurant_ID; city restringe a uma cidade
+        3. Ordenar pela coluna escolhida e devolver no máximo limit linhas (seleção parcial)
+        Input: tabela de restaurantes, texto de busca, cidade, coluna de ordenação, ascending, limite
+        Output: Dataframe com os restaurantes encontrados
+    """
+    df_aux = table
+    if query:
+        df_aux = df_aux.loc[df_aux.index.astype(str).str.startswith(query.strip()), :]
+    if city is not None:
+        df_aux = df_aux.loc[df_aux['City'] == city, :]
+
+    if ascending:
+        df_aux = df_aux.nsmallest(limit, sort_by)
+    else:
+        df_aux = df_aux.nlargest(limit, sort_by)
+    return df_aux.reset_index()
@@ -0,0 +1,116 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+# ====================================================================================
+# Esquema de ingestão do train.csv
+# ====================================================================================
+# tipo de cada coluna lida do CSV (Time_Orderd e Time_Order_picked não são usadas e ficam de fora)
+DTYPES = {
+    'ID': 'object',
+    'Delivery_person_ID': 'object',
+    'Delivery_person_Age': 'float64',           # float para aceitar NaN; vira int depois do filtro
+    'Delivery_person_Ratings': 'float64',
+    'Restaurant_latitude': 'float64',
+    'Restaurant_longitude': 'float64',
+    'Delivery_location_latitude': 'float64',
+    'Delivery_location_longitude': 'float64',
+    'Order_Date': 'object',
+    'Weatherconditions': 'object',
+    'Road_traffic_density': 'object',
+    'Vehicle_condition': 'int64',
+    'Type_of_order': 'object',
+    'Type_of_vehicle': 'object',
+    'multiple_deliveries': 'float64',           # float para aceitar NaN; vira int depois do filtro
+    'Festival': 'object',
+    'City': 'object',
+    'Time_taken(min)': 'object',
+}
+USECOLS = list(DTYPES)
+
+# sentinelas de dado ausente do arquivo original (o valor vem com espaço no final)
+NA_VALUES = ['NaN ', 'NaN']
+
+# linhas com qualquer uma destas colunas ausente são descartadas
+REQUIRED = ['Delivery_person_Age', 'multiple_deliveries', 'Road_traffic_density', 'City', 'Festival']
+
+# colunas de texto que vêm com espaço em branco no final
+STRIP_COLUMNS = ['ID', 'Delivery_person_ID', 'Road_traffic_density', 'City', 'Type_of_vehicle', 'Type_of_order', 'Festival']
+
+# tipo final das colunas convertidas depois do filtro
+CASTS = {
+    'Delivery_person_Age': 'int64',
+    'multiple_deliveries': 'int64',
+}
+
+# colunas de baixa cardinalidade (e o ID do entregador, repetido em muitos pedidos) guardadas como
+# categóricas: códigos inteiros + tabela de categorias, então os groupby agrupam pelos códigos
+CATEGORY_COLUMNS = ['Delivery_person_ID', 'City', 'Road_traffic_density', 'Weatherconditions',
+                    'Type_of_order', 'Type_of_vehicle', 'Festival']
+
+# ID do pedido é único por linha: categorizar não economiza nada, então é guardado como string Arrow
+ORDER_ID_COLUMN = 'ID'
+
+# avaliações são exibidas como médias nas tabelas: em float32 a média mostra ruído de arredondamento
+FLOAT64_COLUMNS = ['Delivery_person_Ratings']
+
+DATE_FORMAT = '%d-%m-%Y'
+TIME_PREFIX = '(min) '
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def read_source(path, **kwargs):
+    """ Finalidade da função:
+        1. Ler o CSV bruto já com os tipos numéricos, as sentinelas de NaN e apenas as colunas do esquema
+        2. Repassar argumentos extras ao pd.read_csv (ex.: chunksize, nrows)
+        Input: caminho do CSV
+        Output: Dataframe bruto (ou iterador de Dataframes, com chunksize)
+    """
+    return pd.read_csv(path, usecols=USECOLS, dtype=DTYPES, na_values=NA_VALUES, **kwargs)
+
+
+def parse_time_taken(series):
+    """ Finalidade da função:
+        1. Extrair de forma vetorizada o número de minutos de valores no formato '(min) 24'
+        2. Valores sem o prefixo ou não numéricos viram NaN
+        3. A coluna tem poucos valores distintos: cada um é convertido uma vez (nas categorias) e o
+           resultado é espalhado pelas linhas com os códigos
+        Input: Series de strings
+        Output: Series float com os minutos
+    """
+    values = series.astype('category')
+    categories = values.cat.categories.astype(object)
+    has_prefix = categories.str.startswith(TIME_PREFIX)
+    minutes = pd.to_numeric(categories.str.slice(len(TIME_PREFIX)), errors='coerce').where(has_prefix)
+    # código -1 (valor ausente) aponta para o NaN acrescentado no final
+    minutes = np.append(np.asarray(minutes, dtype='float64'), np.nan)
+    return pd.Series(minutes[values.cat.codes.to_numpy()], index=series.index)
+
+
+def compact(df1):
+    """ Finalidade da função:
+        1. Converter as colunas de CATEGORY_COLUMNS para categóricas
+        2. Guardar o ID do pedido como string Arrow (buffer contíguo, sem um objeto Python por linha)
+        3. Reduzir as colunas numéricas ao menor tipo que comporta os valores (int8/int16, float32),
+           exceto as de FLOAT64_COLUMNS
+        Input: Dataframe limpo
+        Output: Dataframe compacto
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df1:
+            df1[col] = df1[col].astype('category')
+
+    if ORDER_ID_COLUMN in df1:
+        try:
+            df1[ORDER_ID_COLUMN] = df1[ORDER_ID_COLUMN].astype('string[pyarrow]')
+        except ImportError:     # sem pyarrow o ID continua como object
+            pass
+
+    for col in df1.select_dtypes(include='integer').columns:
+        df1[col] = pd.to_numeric(df1[col], downcast='integer')
+    for col in df1.select_dtypes(include='floating').columns.difference(FLOAT64_COLUMNS):
+        df1[col] = pd.to_numeric(df1[col], downcast='float')
+
+    return df1
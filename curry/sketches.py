@@ -0,0 +1,333 @@
+# Libraries
+import math
+
+import numpy as np
+import pandas as pd
+
+from curry.loader import DATA_PATH, STREAM_CHUNK_ROWS, load_derived
+from curry.weekly import week_key, week_label
+
+# erro relativo padrão das contagens distintas (HyperLogLog: 1,04 / raiz de 2 ** precisão)
+DISTINCT_ERROR = 0.02
+
+# compressão padrão dos t-digests: ~compressão / 2 centróides por grupo (maior = quantis mais precisos)
+COMPRESSION = 100
+
+# grupos guardados: os sketches de cada dia × grupo se combinam em qualquer janela da barra lateral
+DISTINCT_KEYS = ['Order_Date', 'Road_traffic_density']
+DIGEST_KEYS = ['Order_Date', 'City', 'Road_traffic_density']
+
+# colunas resumidas por t-digest
+DIGEST_COLUMNS = {
+    'time': 'Time_taken(min)',
+    'latitude': 'Delivery_location_latitude',
+    'longitude': 'Delivery_location_longitude',
+}
+
+
+# ====================================================================================
+# Funções - HyperLogLog (entregadores distintos)
+# ====================================================================================
+def hll_precision(error):
+    """ Finalidade da função:
+        1. Escolher a precisão do HyperLogLog (2 ** p registradores) para um erro relativo
+        Input: erro relativo desejado (ex.: 0.02)
+        Output: precisão p, entre 4 e 18
+    """
+    return int(np.clip(math.ceil(math.log2((1.04 / error) ** 2)), 4, 18))
+
+
+def _leading_zeros(x):
+    # quantidade de zeros à esquerda de cada uint64 (busca binária vetorizada)
+    n = np.zeros(len(x), dtype='int64')
+    y = x.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        top = (y >> np.uint64(64 - shift)) == 0
+        n[top] += shift
+        y[top] <<= np.uint64(shift)
+    n[x == 0] = 64
+    return n
+
+
+def _reduce_max(codes, registers):
+    # máximo, registrador a registrador, das linhas com o mesmo código (junção de HyperLogLogs)
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    return np.maximum.reduceat(registers[order], starts, axis=0)
+
+
+def hll_estimate(registers):
+    """ Finalidade da função:
+        1. Estimar a quantidade de valores distintos de cada linha de registradores
+        2. Usa contagem linear quando a estimativa é pequena e há registradores vazios
+        Input: matriz (grupos × 2 ** p) de registradores uint8
+        Output: array float com as estimativas
+    """
+    m = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype('float64')), axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    return np.where(small, m * np.log(m / np.maximum(zeros, 1)), raw)
+
+
+def build_distinct(df1, column, keys=DISTINCT_KEYS, error=DISTINCT_ERROR, exact=False):
+    """ Finalidade da função:
+        1. Resumir os valores distintos de column em cada grupo de keys
+        2. HyperLogLog: cada grupo guarda 2 ** p registradores (bytes), qualquer que seja o volume
+        3. exact=True guarda os pares (grupo, valor) distintos, para validar as estimativas
+        Input: Dataframe limpo, coluna contada, colunas do grupo, erro relativo, exact
+        Output: dict com keys (Dataframe dos grupos, ordenado por data) e registers; ou values no modo exato
+    """
+    if exact:
+        values = df1.loc[:, keys + [column]].drop_duplicates()
+        return {'precision': None, 'column': column, 'values': values.sort_values(keys, ignore_index=True)}
+
+    p = hll_precision(error)
+    m = 1 << p
+    hashes = pd.util.hash_pandas_object(df1[column], index=False).to_numpy()
+    idx = (hashes >> np.uint64(64 - p)).astype('int64')
+    rho = np.minimum(_leading_zeros(hashes << np.uint64(p)) + 1, 64 - p + 1)
+
+    groups = df1.groupby(keys, observed=True, dropna=False)
+    codes = groups.ngroup().to_numpy()
+    registers = np.zeros((groups.ngroups, m), dtype='uint8')
+    best = pd.Series(rho).groupby(codes * m + idx).max()
+    registers.reshape(-1)[best.index.to_numpy()] = best.to_numpy()
+
+    return {'precision': p, 'column': column, 'keys': groups.size().reset_index().loc[:, keys],
+            'registers': registers}
+
+
+def merge_distinct(stores):
+    """ Finalidade da função:
+        1. Juntar resumos de valores distintos de partes do dataset (máximo dos registradores por grupo)
+        Input: lista de resumos (build_distinct), todos com a mesma precisão
+        Output: resumo combinado
+    """
+    first = stores[0]
+    if first['precision'] is None:
+        values = pd.concat([s['values'] for s in stores], ignore_index=True).drop_duplicates()
+        keys = [c for c in values.columns if c != first['column']]
+        return dict(first, values=values.sort_values(keys, ignore_index=True))
+
+    keys = pd.concat([s['keys'] for s in stores], ignore_index=True)
+    codes = keys.groupby(list(keys.columns), observed=True, dropna=False).ngroup().to_numpy()
+    registers = _reduce_max(codes, np.concatenate([s['registers'] for s in stores]))
+    order = np.argsort(codes, kind='stable')
+    first_rows = order[np.r_[True, np.diff(codes[order]) != 0]]
+    return dict(first, keys=keys.iloc[first_rows].reset_index(drop=True), registers=registers)
+
+
+def _window(keys, date_range, traffic_options):
+    # máscara dos grupos dentro da janela de datas (inclusiva) e das condições de trânsito escolhidas
+    mask = np.ones(len(keys), dtype=bool)
+    if date_range is not None:
+        start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+        dates = keys['Order_Date'].to_numpy()
+        mask &= (dates >= start) & (dates <= end)
+    if traffic_options is not None:
+        mask &= keys['Road_traffic_density'].isin(traffic_options).to_numpy()
+    return mask
+
+
+def distinct_count(store, date_range=None, traffic_options=None, by_week=False):
+    """ Finalidade da função:
+        1. Quantidade de valores distintos na janela, juntando os resumos dos dias × grupos selecionados
+        Input: resumo (build_distinct), tupla (início, fim), condições de trânsito, by_week
+        Output: número; com by_week, Series indexada por week_key
+    """
+    if store['precision'] is None:
+        values = store['values'].loc[_window(store['values'], date_range, traffic_options), :]
+        column = values[store['column']]
+        if not by_week:
+            return int(column.nunique())
+        return column.groupby(week_key(values['Order_Date'])).nunique().rename_axis('week_key')
+
+    mask = _window(store['keys'], date_range, traffic_options)
+    keys, registers = store['keys'].loc[mask, :], store['registers'][mask]
+    if not len(keys):
+        return 0 if not by_week else pd.Series(dtype='float64').rename_axis('week_key')
+    if not by_week:
+        return float(hll_estimate(registers.max(axis=0)[None, :])[0])
+
+    weeks = week_key(keys['Order_Date'])
+    labels = np.unique(weeks)
+    return pd.Series(hll_estimate(_reduce_max(weeks, registers)), index=pd.Index(labels, name='week_key'))
+
+
+# ====================================================================================
+# Funções - t-digest (medianas e percentis)
+# ====================================================================================
+def _compress(table, keys, compression):
+    # junta centróides vizinhos de cada grupo: o limite de tamanho segue a escala k1 do t-digest
+    # (centróides pequenos nas caudas, grandes no meio); compression=None só junta valores iguais
+    table = table.groupby(keys + ['mean'], observed=True, dropna=False)['weight'].sum().reset_index()
+    if compression is None:
+        return table
+
+    weight = table['weight'].to_numpy()
+    groups = table.groupby(keys, observed=True, sort=False, dropna=False)['weight']
+    q = (groups.cumsum().to_numpy() - weight / 2) / groups.transform('sum').to_numpy()
+    bucket = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))).astype('int64')
+
+    df_aux = table.assign(bucket=bucket, weighted=table['mean'] * weight)
+    df_aux = df_aux.groupby(keys + ['bucket'], observed=True, dropna=False)[['weighted', 'weight']].sum().reset_index()
+    df_aux['mean'] = df_aux['weighted'] / df_aux['weight']
+    return df_aux.loc[:, keys + ['mean', 'weight']]
+
+
+def build_digest(df1, column, keys=DIGEST_KEYS, compression=COMPRESSION):
+    """ Finalidade da função:
+        1. Resumir a distribuição de column em cada grupo de keys por um t-digest (centróides média/peso)
+        2. compression=None guarda cada valor distinto com sua contagem (quantis exatos)
+        Input: Dataframe limpo, coluna, colunas do grupo, compressão
+        Output: Dataframe com keys, mean e weight, ordenado por grupo e valor
+    """
+    values = df1[column].astype('float64')
+    table = df1.loc[values.notna(), keys].assign(mean=values[values.notna()], weight=1.0)
+    return _compress(table, keys, compression)
+
+
+def merge_digests(tables, compression=COMPRESSION):
+    """ Finalidade da função:
+        1. Juntar t-digests de partes do dataset (mesmos grupos) e recomprimir
+        Input: lista de Dataframes de centróides, compressão (None no modo exato)
+        Output: Dataframe de centróides combinado
+    """
+    table = pd.concat(tables, ignore_index=True)
+    keys = [c for c in table.columns if c not in ('mean', 'weight')]
+    return _compress(table, keys, compression)
+
+
+def _quantile(means, weights, qs, exact):
+    # quantis de um grupo a partir dos centróides ordenados pela média
+    cum = np.cumsum(weights)
+    if exact:
+        # mesmo critério do pandas (interpolação linear entre as posições (n - 1) * q)
+        pos = (cum[-1] - 1) * np.asarray(qs, dtype='float64')
+        lo = means[np.searchsorted(cum, np.floor(pos), side='right')]
+        hi = means[np.searchsorted(cum, np.ceil(pos), side='right')]
+        return lo + (hi - lo) * (pos - np.floor(pos))
+    centers = cum - weights / 2
+    return np.interp(np.asarray(qs) * cum[-1], centers, means)
+
+
+def digest_quantiles(table, qs, date_range=None, traffic_options=None, by=None, exact=False):
+    """ Finalidade da função:
+        1. Calcular quantis na janela juntando os centróides dos dias × grupos selecionados
+        Input: Dataframe de centróides, lista de quantis (0-1), tupla (início, fim), condições de trânsito,
+               colunas de agrupamento do resultado (None = total), exact (centróides sem compressão)
+        Output: Dataframe com by e uma coluna por quantil (sem linhas se a janela não tiver pedidos)
+    """
+    table = table.loc[_window(table, date_range, traffic_options), :]
+    parts = table.groupby(by, observed=True) if by else [((), table)]
+
+    rows = []
+    for key, part in parts:
+        if not len(part):
+            continue
+        part = part.sort_values('mean', kind='mergesort')
+        values = _quantile(part['mean'].to_numpy(), part['weight'].to_numpy(), qs, exact)
+        key = key if isinstance(key, tuple) else (key,)
+        rows.append(list(key) + list(values))
+    return pd.DataFrame(rows, columns=(by or []) + list(qs))
+
+
+# ====================================================================================
+# Funções - conjunto de sketches do dashboard
+# ====================================================================================
+def build_sketches(df1, error=DISTINCT_ERROR, compression=COMPRESSION, exact=False):
+    """ Finalidade da função:
+        1. Montar os sketches por dia × grupo: entregadores distintos (HyperLogLog) e t-digests do tempo
+           de entrega e das coordenadas de entrega
+        2. exact=True troca os sketches pelos valores distintos (validação dos erros)
+        Input: Dataframe limpo, erro relativo das contagens, compressão dos t-digests, exact
+        Output: dict com couriers, time, latitude, longitude e exact
+    """
+    sketches = {'exact': exact,
+                'couriers': build_distinct(df1, 'Delivery_person_ID', error=error, exact=exact)}
+    for name, column in DIGEST_COLUMNS.items():
+        sketches[name] = build_digest(df1, column, compression=None if exact else compression)
+    return sketches
+
+
+def merge_sketches(parts, compression=COMPRESSION):
+    """ Finalidade da função:
+        1. Juntar os sketches de partes do dataset (blocos ou fatias do CSV)
+        Input: lista de dicts de build_sketches, compressão
+        Output: dict combinado
+    """
+    exact = parts[0]['exact']
+    sketches = {'exact': exact, 'couriers': merge_distinct([p['couriers'] for p in parts])}
+    for name in DIGEST_COLUMNS:
+        sketches[name] = merge_digests([p[name] for p in parts], None if exact else compression)
+    return sketches
+
+
+def append_sketches(sketches, part, offset=None):
+    """ Finalidade da função:
+        1. Acrescentar aos sketches os de um lote novo (entregadores distintos por semana incluídos),
+           com custo proporcional ao nº de grupos, sem reler os pedidos
+        Input: sketches, sketches do lote, linhas antes do lote (não usado: os sketches não guardam posições)
+        Output: dict combinado
+    """
+    return merge_sketches([sketches, part])
+
+
+def load_sketches(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir os sketches uma única vez por versão dos dados (cache do processo)
+        2. No modo em blocos (STREAM_CHUNK_ROWS) eles são agregados bloco a bloco
+        3. Lotes acrescentados (curry.append) atualizam os sketches com append_sketches
+        Input: caminho do arquivo
+        Output: dict dos sketches (compartilhado, não deve ser alterado)
+    """
+    if STREAM_CHUNK_ROWS:
+        from curry.stream import load_streamed
+        return load_streamed(path)['sketches']
+
+    columns = sorted(set(DISTINCT_KEYS + DIGEST_KEYS + ['Delivery_person_ID'] + list(DIGEST_COLUMNS.values())))
+    return load_derived('sketches', build_sketches, path, columns, append=append_sketches)
+
+
+def delivery_time_percentiles(sketches, date_range, traffic_options, qs=(0.5, 0.9, 0.99), by=None):
+    """ Finalidade da função:
+        1. Percentis do tempo de entrega (Time_taken(min)) na janela, pelos t-digests
+        Input: sketches, tupla (início, fim), condições de trânsito, quantis, colunas de agrupamento
+        Output: Dataframe com by e uma coluna por quantil
+    """
+    return digest_quantiles(sketches['time'], list(qs), date_range, traffic_options, by, sketches['exact'])
+
+
+def sketch_centroids(sketches, date_range, traffic_options):
+    """ Finalidade da função:
+        1. Mediana das coordenadas de entrega de cada cidade, por tráfego, pelos t-digests
+           (mesmo formato de curry.metrics.city_centroids, sem ler os pedidos)
+        Input: sketches, tupla (início, fim), condições de trânsito
+        Output: Dataframe com City, Road_traffic_density, Delivery_location_latitude e Delivery_location_longitude
+    """
+    by = ['City', 'Road_traffic_density']
+    df_aux = None
+    for name in ['latitude', 'longitude']:
+        part = digest_quantiles(sketches[name], [0.5], date_range, traffic_options, by, sketches['exact'])
+        part = part.rename(columns={0.5: DIGEST_COLUMNS[name]})
+        df_aux = part if df_aux is None else df_aux.merge(part, on=by)
+    return df_aux
+
+
+def sketch_orders_per_courier(sketches, daily, date_range, traffic_options):
+    """ Finalidade da função:
+        1. Pedidos por entregador em cada semana, com os entregadores distintos vindos do HyperLogLog
+           (mesmo formato de curry.weekly.weekly_orders_per_courier, sem ler os pedidos)
+        Input: sketches, pedidos por dia (curry.timeindex.daily_orders), tupla (início, fim), condições de trânsito
+        Output: Dataframe com week_key, week_of_year, orders, couriers e order_by_deliver
+    """
+    orders = daily['orders'].groupby(week_key(daily['Order_Date'])).sum().rename_axis('week_key')
+    couriers = distinct_count(sketches['couriers'], date_range, traffic_options, by_week=True)
+
+    df_aux = pd.DataFrame({'orders': orders, 'couriers': couriers}).dropna().reset_index()
+    df_aux = df_aux.loc[df_aux['couriers'] > 0, :].reset_index(drop=True)
+    df_aux['week_of_year'] = week_label(df_aux['week_key'])
+    df_aux['order_by_deliver'] = df_aux['orders'] / df_aux['couriers']
+    return df_aux.loc[:, ['week_key', 'week_of_year', 'orders', 'couriers', 'order_by_deliver']]
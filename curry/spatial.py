@@ -0,0 +1,167 @@
+# Libraries
+import numpy as np
+
+from curry.geo import EARTH_RADIUS_KM, haversine_np
+from curry.loader import DATA_PATH, load_derived
+from curry.timeindex import row_slice
+
+# lado das células da grade, em graus (~5,5 km de latitude para as entregas, ~22 km para os restaurantes)
+DELIVERY_CELL_DEGREES = 0.05
+RESTAURANT_CELL_DEGREES = 0.2
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def build_grid(lat, lon, cell_deg):
+    """ Finalidade da função:
+        1. Montar um índice espacial de grade uniforme (lat/lon) sobre um conjunto de pontos
+        2. Os pontos são ordenados pela célula (ordem CSR): cada célula vira uma fatia contínua do array
+        Input: arrays de latitude e longitude (graus), lado da célula em graus
+        Output: dict com os pontos, as chaves das células ocupadas e o início de cada célula
+    """
+    lat = np.asarray(lat, dtype='float64')
+    lon = np.asarray(lon, dtype='float64')
+    cell_lat = np.floor(lat / cell_deg).astype('int64')
+    cell_lon = np.floor(lon / cell_deg).astype('int64')
+
+    lat_min, lon_min = (cell_lat.min(), cell_lon.min()) if len(lat) else (0, 0)
+    lon_span = (cell_lon.max() - lon_min + 1) if len(lat) else 1
+    keys = (cell_lat - lat_min) * lon_span + (cell_lon - lon_min)
+
+    order = np.argsort(keys, kind='stable')
+    cell_keys, starts = np.unique(keys[order], return_index=True)
+
+    return {
+        'lat': lat[order], 'lon': lon[order], 'order': order,
+        'cell_deg': cell_deg, 'lat_min': lat_min, 'lon_min': lon_min, 'lon_span': lon_span,
+        'cell_keys': cell_keys, 'starts': np.append(starts, len(order)),
+    }
+
+
+def query_radius(grid, lat, lon, radius_km):
+    """ Finalidade da função:
+        1. Encontrar os pontos a até radius_km de (lat, lon)
+        2. Percorre apenas as células do retângulo que contém o círculo e confirma com a distância haversine
+        Input: grade, latitude e longitude do ponto, raio em km
+        Output: posições dos pontos (na ordem original) e suas distâncias em km, ordenados pela distância
+    """
+    cell = grid['cell_deg']
+    dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+    max_lat = min(abs(lat) + dlat, 89.9)
+    dlon = min(np.degrees(radius_km / (EARTH_RADIUS_KM * np.cos(np.radians(max_lat)))), 180)
+
+    rows = np.arange(np.floor((lat - dlat) / cell), np.floor((lat + dlat) / cell) + 1, dtype='int64') - grid['lat_min']
+    cols = np.arange(np.floor((lon - dlon) / cell), np.floor((lon + dlon) / cell) + 1, dtype='int64') - grid['lon_min']
+    cols = cols[(cols >= 0) & (cols < grid['lon_span'])]
+    rows = rows[rows >= 0]
+
+    # células candidatas que existem no índice
+    wanted = (rows[:, None] * grid['lon_span'] + cols[None, :]).ravel()
+    pos = np.searchsorted(grid['cell_keys'], wanted)
+    found = pos < len(grid['cell_keys'])
+    found[found] = grid['cell_keys'][pos[found]] == wanted[found]
+    pos = pos[found]
+
+    # posições de todos os pontos dessas células (concatenação vetorizada das fatias)
+    begin = grid['starts'][pos]
+    lengths = grid['starts'][pos + 1] - begin
+    candidates = np.repeat(begin - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    dist = haversine_np(lat, lon, grid['lat'][candidates], grid['lon'][candidates])
+    inside = dist <= radius_km
+    candidates, dist = candidates[inside], dist[inside]
+    sort = np.argsort(dist, kind='stable')
+    return grid['order'][candidates[sort]], dist[sort]
+
+
+def query_nearest(grid, lat, lon, k):
+    """ Finalidade da função:
+        1. Encontrar os k pontos mais próximos de (lat, lon)
+        2. Busca por raio crescente (dobrando a cada passo) até conter k pontos
+        Input: grade, latitude e longitude do ponto, k
+        Output: posições dos pontos (na ordem original) e suas distâncias em km, ordenados pela distância
+    """
+    n = len(grid['order'])
+    radius = grid['cell_deg'] * 111.0
+    while True:
+        positions, dist = query_radius(grid, lat, lon, radius)
+        if len(positions) >= min(k, n) or radius > np.pi * EARTH_RADIUS_KM:
+            return positions[:k], dist[:k]
+        radius *= 2
+
+
+def build_spatial_index(df1):
+    """ Finalidade da função:
+        1. Indexar os locais de entrega (grade por pedido) e os restaurantes distintos (Restaurant_ID)
+        2. Calcular os percentis do raio de entrega (Delivery_distance) de cada restaurante
+        Input: Dataframe limpo
+        Output: dict com as grades 'deliveries' e 'restaurants' e o Dataframe 'restaurant_radius'
+    """
+    deliveries = build_grid(df1['Delivery_location_latitude'], df1['Delivery_location_longitude'],
+                            DELIVERY_CELL_DEGREES)
+
+    radius = df1['Delivery_distance'].astype('float64').groupby(df1['Restaurant_ID'])
+    restaurant_radius = radius.quantile([0.5, 0.9]).unstack()
+    restaurant_radius.columns = ['p50_km', 'p90_km']
+    restaurant_radius['max_km'] = radius.max()
+    restaurant_radius['orders'] = radius.size()
+    for position, col in enumerate(['Restaurant_latitude', 'Restaurant_longitude']):
+        coords = df1[col].astype('float64').round(6).groupby(df1['Restaurant_ID']).first()
+        restaurant_radius.insert(position, col, coords)
+    restaurant_radius = restaurant_radius.reset_index()
+
+    restaurants = build_grid(restaurant_radius['Restaurant_latitude'], restaurant_radius['Restaurant_longitude'],
+                             RESTAURANT_CELL_DEGREES)
+    return {'deliveries': deliveries, 'restaurants': restaurants, 'restaurant_radius': restaurant_radius}
+
+
+def load_spatial_index(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir o índice espacial uma única vez por versão dos dados (cache do processo)
+        Input: caminho do arquivo
+        Output: dict do índice espacial (compartilhado, não deve ser alterado)
+    """
+    columns = ['Restaurant_ID', 'Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude',
+               'Delivery_location_longitude', 'Delivery_distance']
+    return load_derived('spatial_index', build_spatial_index, path, columns)
+
+
+def orders_within(index, lat, lon, radius_km):
+    """ Finalidade da função:
+        1. Pedidos entregues a até radius_km de um ponto
+        Input: índice espacial, latitude, longitude, raio em km
+        Output: posições das linhas no dataset (ordem original) e distâncias até o ponto
+    """
+    return query_radius(index['deliveries'], lat, lon, radius_km)
+
+
+def nearest_restaurants(index, lat, lon, k=5):
+    """ Finalidade da função:
+        1. Os k restaurantes mais próximos de um ponto, com os percentis do raio de entrega de cada um
+        Input: índice espacial, latitude, longitude, k
+        Output: Dataframe com Restaurant_ID, coordenadas, distance_km, p50_km, p90_km, max_km e orders
+    """
+    positions, dist = query_nearest(index['restaurants'], lat, lon, k)
+    df_aux = index['restaurant_radius'].iloc[positions].copy()
+    df_aux.insert(3, 'distance_km', dist)
+    return df_aux.reset_index(drop=True)
+
+
+def orders_near(df_all, index, time_index, lat, lon, radius_km, date_range, traffic_options):
+    """ Finalidade da função:
+        1. Encontrar pelo índice espacial os pedidos entregues a até radius_km do ponto
+        2. Aplicar os filtros da barra lateral apenas sobre esses pedidos (janela de linhas + trânsito)
+        Input: Dataframe sem filtros, índice espacial, índice temporal, latitude, longitude, raio,
+               período (início, fim), condições de trânsito
+        Output: Dataframe com os pedidos encontrados e a coluna distance_km (distância até o ponto)
+    """
+    positions, dist = orders_within(index, lat, lon, radius_km)
+
+    window = row_slice(time_index, date_range)
+    inside = (positions >= window.start) & (positions < window.stop)
+    positions, dist = positions[inside], dist[inside]
+
+    df_aux = df_all.iloc[positions].assign(distance_km=dist)
+    df_aux = df_aux.loc[df_aux['Road_traffic_density'].isin(traffic_options), :]
+    return df_aux
@@ -0,0 +1,94 @@
+# Libraries
+from curry import schema
+from curry.cube import DIMENSIONS, build_cube, merge_cubes
+from curry.geobins import build_geo_bins, merge_geo_bins
+from curry.loader import DATA_PATH, INGEST_WORKERS, STREAM_CHUNK_ROWS, clean_code, load_aggregate
+from curry.parallel import merge_reports, parallel_fold
+from curry.sketches import build_sketches, merge_sketches
+from curry.timeindex import time_index_from_cube
+
+# agregados montados no modo em blocos: nome -> (agregação de um bloco limpo, junção de agregados)
+AGGREGATES = {
+    'cube': (build_cube, merge_cubes),
+    'geo_bins': (build_geo_bins, merge_geo_bins),
+    'sketches': (build_sketches, merge_sketches),
+}
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def clean_chunks(path, chunk_rows, report=None):
+    """ Finalidade da função:
+        1. Ler o CSV em blocos de chunk_rows linhas e limpar cada bloco com as mesmas regras de clean_code
+           e os mesmos tipos compactos do dataset em memória (schema.compact), para que os agregados coincidam
+        2. O relatório de ingestão acumula as linhas lidas e rejeitadas de todos os blocos
+        Input: caminho do CSV, linhas por bloco, report (dict opcional)
+        Output: gerador de Dataframes limpos
+    """
+    for chunk in schema.read_source(path, chunksize=chunk_rows):
+        yield schema.compact(clean_code(chunk, report))
+
+
+def fold_chunks(path, chunk_rows, aggregates=AGGREGATES):
+    """ Finalidade da função:
+        1. Agregar cada bloco limpo e juntá-lo ao acumulado logo em seguida: a memória depende do tamanho
+           do bloco e da quantidade de grupos, não do tamanho do histórico
+        Input: caminho do CSV, linhas por bloco, dict nome -> (agregação, junção)
+        Output: dict nome -> agregado final; relatório de ingestão
+    """
+    report = {}
+    folded = {}
+    for chunk in clean_chunks(path, chunk_rows, report):
+        for name, (build, merge) in aggregates.items():
+            part = build(chunk)
+            folded[name] = part if name not in folded else merge([folded[name], part])
+    return folded, report
+
+
+def build_streamed(path, chunk_rows=None):
+    """ Finalidade da função:
+        1. Montar, no modo em blocos, o cubo, a grade do mapa, os sketches e o índice temporal (derivado do cubo)
+        2. Com INGEST_WORKERS, as fatias do CSV são agregadas em paralelo (curry.parallel)
+        3. As dimensões de texto viram categóricas no final, como no dataset em memória
+        Input: caminho do CSV, linhas por bloco (padrão: STREAM_CHUNK_ROWS)
+        Output: dict com cube, geo_bins, sketches, time_index e report
+    """
+    if INGEST_WORKERS:
+        folded, report = parallel_fold(path, AGGREGATES, INGEST_WORKERS)
+    else:
+        folded, report = fold_chunks(path, chunk_rows or STREAM_CHUNK_ROWS)
+
+    return _finish(folded, report)
+
+
+def append_streamed(streamed, batch, report):
+    """ Finalidade da função:
+        1. Acrescentar aos agregados do modo em blocos um lote novo (curry.append), já limpo
+        2. Cada agregado do lote é juntado ao existente; o índice temporal é refeito a partir do cubo
+        Input: dict de build_streamed, Dataframe do lote, relatório de ingestão do lote
+        Output: dict combinado
+    """
+    folded = {name: merge([streamed[name], build(batch)]) for name, (build, merge) in AGGREGATES.items()}
+    return _finish(folded, merge_reports([streamed['report'], report]))
+
+
+def _finish(folded, report):
+    # dimensões de texto como categóricas (como no dataset em memória) e índice temporal derivado do cubo
+    cube, geo_bins = folded['cube'], folded['geo_bins']
+    for col in DIMENSIONS[1:]:
+        cube[col] = cube[col].astype('category')
+    geo_bins['Road_traffic_density'] = geo_bins['Road_traffic_density'].astype('category')
+
+    return {'cube': cube, 'geo_bins': geo_bins, 'sketches': folded['sketches'],
+            'time_index': time_index_from_cube(cube), 'report': report}
+
+
+def load_streamed(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Montar os agregados do modo em blocos uma única vez por versão dos dados (cache do processo)
+        2. Lotes acrescentados (curry.append) entram com append_streamed
+        Input: caminho do arquivo
+        Output: dict com cube, geo_bins, sketches, time_index e report (compartilhado, não deve ser alterado)
+    """
+    return load_aggregate('streamed', build_streamed, path, append=append_streamed)
@@ -0,0 +1,41 @@
+# Libraries
+import pandas as pd
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def page_count(total, page_size):
+    """ Finalidade da função:
+        1. Quantidade de páginas necessárias para total linhas (no mínimo 1)
+        Input: total de linhas, linhas por página
+        Output: int
+    """
+    return max(1, -(-total // page_size))
+
+
+def table_page(df1, page=1, page_size=50, sort_by=None, ascending=True, search=None, search_column=None):
+    """ Finalidade da função:
+        1. Filtrar (search contido em search_column), ordenar e recortar uma página da tabela no servidor,
+           para que só as linhas visíveis sejam enviadas ao navegador
+        2. Em colunas numéricas usa seleção parcial (nsmallest/nlargest) até o fim da página pedida,
+           em vez de ordenar a tabela inteira
+        Input: Dataframe, página (começando em 1), linhas por página, coluna de ordenação, ascending,
+               texto de busca, coluna da busca
+        Output: Dataframe com as linhas da página, total de linhas depois do filtro
+    """
+    if search and search_column is not None:
+        values = df1[search_column].astype(str)
+        df1 = df1.loc[values.str.contains(search, case=False, regex=False).to_numpy(), :]
+
+    total = len(df1)
+    page = min(max(1, int(page)), page_count(total, page_size))
+    start, stop = (page - 1) * page_size, page * page_size
+
+    if sort_by is not None:
+        if pd.api.types.is_numeric_dtype(df1[sort_by]) and stop < total // 2:
+            df1 = df1.nsmallest(stop, sort_by) if ascending else df1.nlargest(stop, sort_by)
+        else:
+            df1 = df1.sort_values(sort_by, ascending=ascending, kind='mergesort')
+
+    return df1.iloc[start:stop], total
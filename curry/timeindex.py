@@ -0,0 +1,176 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from curry.loader import DATA_PATH, STREAM_CHUNK_ROWS, load_derived
+
+# medidas acumuladas por dia e por condição de trânsito
+MEASURES = ['orders', 'time_sum', 'time_sumsq', 'rating_count', 'rating_sum', 'rating_sumsq']
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def build_time_index(df1):
+    """ Finalidade da função:
+        1. A partir do dataset ordenado por Order_Date, guardar os dias existentes e a linha onde cada dia começa
+        2. Calcular somas de prefixo (acumuladas dia a dia) de cada medida, separadas por condição de trânsito
+        Com isso qualquer janela de datas é respondida com searchsorted + diferença de prefixos, sem varrer linhas.
+        Input: Dataframe limpo e ordenado por Order_Date
+        Output: dict com days, row_offsets, traffic e prefix (uma matriz (dias + 1) × trânsito por medida)
+    """
+    dates = df1['Order_Date'].to_numpy()
+    days, starts = np.unique(dates, return_index=True)
+    row_offsets = np.append(starts, len(dates))
+
+    traffic = df1['Road_traffic_density'].astype('category')
+    levels = list(traffic.cat.categories)
+
+    time = df1['Time_taken(min)'].astype('float64')
+    rating = df1['Delivery_person_Ratings'].astype('float64')
+    df_aux = pd.DataFrame({
+        'day': np.searchsorted(days, dates),
+        'traffic': traffic.cat.codes.to_numpy(),
+        'orders': 1.0,
+        'time_sum': time.to_numpy(),
+        'time_sumsq': time.to_numpy() ** 2,
+        'rating_count': rating.notna().to_numpy().astype('float64'),
+        'rating_sum': rating.fillna(0).to_numpy(),
+        'rating_sumsq': rating.fillna(0).to_numpy() ** 2,
+    })
+    daily = df_aux.groupby(['day', 'traffic'])[MEASURES].sum()
+    return {'days': days, 'row_offsets': row_offsets, 'traffic': levels, 'prefix': _prefix_sums(daily, len(days), len(levels))}
+
+
+def time_index_from_cube(cube):
+    """ Finalidade da função:
+        1. Montar o índice temporal a partir do cubo (modo em blocos, sem o dataset em memória)
+        2. As somas de prefixo são as mesmas de build_time_index; sem as linhas do dataset, row_offsets é None
+        Input: cubo ordenado por Order_Date
+        Output: dict com days, row_offsets (None), traffic e prefix
+    """
+    days, day = np.unique(cube['Order_Date'].to_numpy(), return_inverse=True)
+    traffic = cube['Road_traffic_density'].astype('category')
+    levels = list(traffic.cat.categories)
+
+    df_aux = cube.loc[:, MEASURES].assign(day=day, traffic=traffic.cat.codes.to_numpy())
+    daily = df_aux.groupby(['day', 'traffic'])[MEASURES].sum()
+    return {'days': days, 'row_offsets': None, 'traffic': levels, 'prefix': _prefix_sums(daily, len(days), len(levels))}
+
+
+def append_time_index(index, part, offset):
+    """ Finalidade da função:
+        1. Acrescentar ao índice temporal o índice de um lote cujas datas começam no último dia do índice ou depois
+        2. As somas diárias dos dois (diferenças dos prefixos) são somadas dia a dia e os prefixos refeitos:
+           custo proporcional ao nº de dias, sem reler os pedidos
+        3. As linhas do lote começam na posição offset: os inícios dos dias novos são deslocados
+        Input: índice temporal, índice do lote (build_time_index), linhas antes do lote
+        Output: índice combinado
+    """
+    days = np.union1d(index['days'], part['days'])
+    levels = sorted(set(index['traffic']) | set(part['traffic']))
+
+    prefix = {}
+    for measure in MEASURES:
+        grid = np.zeros((len(days) + 1, len(levels)))
+        for source in [index, part]:
+            rows = np.searchsorted(days, source['days']) + 1
+            cols = [levels.index(level) for level in source['traffic']]
+            grid[np.ix_(rows, cols)] += np.diff(source['prefix'][measure], axis=0)
+        prefix[measure] = np.cumsum(grid, axis=0)
+
+    row_offsets = None
+    if index['row_offsets'] is not None:
+        # o primeiro dia do lote pode ser o último do índice: esse dia continua começando onde já começava
+        new_days = part['days'] > index['days'][-1] if len(index['days']) else np.ones(len(part['days']), dtype=bool)
+        starts = np.concatenate([index['row_offsets'][:-1], part['row_offsets'][:-1][new_days] + offset])
+        row_offsets = np.append(starts, offset + part['row_offsets'][-1])
+
+    return {'days': days, 'row_offsets': row_offsets, 'traffic': levels, 'prefix': prefix}
+
+
+def _prefix_sums(daily, n_days, n_levels):
+    # somas acumuladas dia a dia de cada medida: matriz (dias + 1) × trânsito, com a linha 0 zerada
+    prefix = {}
+    for measure in MEASURES:
+        grid = np.zeros((n_days + 1, n_levels))
+        grid[daily.index.get_level_values('day') + 1, daily.index.get_level_values('traffic')] = daily[measure].to_numpy()
+        prefix[measure] = np.cumsum(grid, axis=0)
+    return prefix
+
+
+def load_time_index(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Construir o índice temporal uma única vez por versão dos dados (cache do processo)
+        2. No modo em blocos (STREAM_CHUNK_ROWS) ele vem do cubo agregado bloco a bloco
+        3. Lotes acrescentados (curry.append) atualizam o índice com append_time_index
+        Input: caminho do arquivo
+        Output: dict do índice temporal (compartilhado, não deve ser alterado)
+    """
+    if STREAM_CHUNK_ROWS:
+        from curry.stream import load_streamed
+        return load_streamed(path)['time_index']
+
+    columns = ['Order_Date', 'Road_traffic_density', 'Time_taken(min)', 'Delivery_person_Ratings']
+    return load_derived('time_index', build_time_index, path, columns, append=append_time_index)
+
+
+def day_range(index, date_range):
+    """ Finalidade da função:
+        1. Converter uma janela de datas (início e fim, inclusivos) nas posições dos dias do índice
+        Input: índice temporal, tupla (início, fim)
+        Output: tupla (i, j) com os dias index['days'][i:j] dentro da janela
+    """
+    start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+    i = np.searchsorted(index['days'], start, side='left')
+    j = np.searchsorted(index['days'], end, side='right')
+    return i, max(i, j)
+
+
+def row_slice(index, date_range):
+    """ Finalidade da função:
+        1. Informar o intervalo de linhas do dataset (ordenado por data) que cai na janela
+        Input: índice temporal, tupla (início, fim)
+        Output: slice para usar com df1.iloc
+    """
+    i, j = day_range(index, date_range)
+    return slice(int(index['row_offsets'][i]), int(index['row_offsets'][j]))
+
+
+def _traffic_columns(index, traffic_options):
+    if traffic_options is None:
+        return np.arange(len(index['traffic']))
+    return np.array([k for k, level in enumerate(index['traffic']) if level in traffic_options], dtype=int)
+
+
+def daily_orders(index, date_range, traffic_options=None):
+    """ Finalidade da função:
+        1. Quantidade de pedidos por dia dentro da janela, para as condições de trânsito escolhidas
+        Input: índice temporal, tupla (início, fim), lista de condições de trânsito
+        Output: Dataframe com Order_Date e orders
+    """
+    i, j = day_range(index, date_range)
+    cols = _traffic_columns(index, traffic_options)
+    orders = np.diff(index['prefix']['orders'][i:j + 1][:, cols], axis=0).sum(axis=1)
+    return pd.DataFrame({'Order_Date': index['days'][i:j], 'orders': orders.astype('int64')})
+
+
+def window_totals(index, date_range, traffic_options=None):
+    """ Finalidade da função:
+        1. Somar cada medida na janela com duas leituras do prefixo (custo independente do tamanho da janela)
+        2. Derivar média e desvio padrão do tempo de entrega e da avaliação
+        Input: índice temporal, tupla (início, fim), lista de condições de trânsito
+        Output: dict com as medidas somadas e mean/std
+    """
+    i, j = day_range(index, date_range)
+    cols = _traffic_columns(index, traffic_options)
+    totals = {m: float((index['prefix'][m][j, cols] - index['prefix'][m][i, cols]).sum()) for m in MEASURES}
+
+    for name, count, total, total_sq in [('delivery_time', 'orders', 'time_sum', 'time_sumsq'),
+                                         ('rating', 'rating_count', 'rating_sum', 'rating_sumsq')]:
+        n = totals[count]
+        mean = totals[total] / n if n > 0 else np.nan
+        var = (totals[total_sq] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+        totals['mean_' + name] = mean
+        totals['std_' + name] = np.sqrt(max(var, 0)) if n > 1 else np.nan
+    return totals
@@ -0,0 +1,189 @@
+# Libraries
+import glob
+import os
+import shutil
+import threading
+import time
+
+from curry import loader
+from curry.loader import DATA_PATH, STREAM_CHUNK_ROWS, data_version
+
+# intervalo (segundos) entre as verificações do arquivo de dados; CURRY_WATCH_SECONDS=0 desliga o watcher
+WATCH_SECONDS = float(os.environ.get('CURRY_WATCH_SECONDS', 5))
+
+# pasta opcional com lotes novos (CSV no esquema do train.csv): cada lote é acrescentado com curry.append
+# e movido para a subpasta PROCESSED_DIR (ou REJECTED_DIR, se não puder ser acrescentado)
+WATCH_DIR = os.environ.get('CURRY_WATCH_DIR') or None
+PROCESSED_DIR = 'processed'
+REJECTED_DIR = 'rejected'
+
+# uma reconstrução por vez no processo, qualquer que seja o arquivo
+_rebuild_lock = threading.Lock()
+
+# estado do watcher por arquivo: versão publicada, versão em construção, último erro
+_status = {}
+_threads = {}
+_lock = threading.Lock()
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def warm(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Montar o que as páginas leem ao abrir: dataset guardado (arquivo colunar, layout particionado e
+           relatório de ingestão) e as estruturas derivadas; no modo em blocos, os agregados bloco a bloco
+        2. Chamada pela thread do watcher com uma versão em construção (loader.stage): nada disso é visto
+           pelas sessões antes de loader.publish
+        Input: caminho do arquivo
+        Output: None
+    """
+    if STREAM_CHUNK_ROWS:
+        from curry.stream import load_streamed
+        load_streamed(path)
+        return
+
+    from curry.couriers import load_courier_profiles
+    from curry.cube import load_cube
+    from curry.geobins import load_geo_bins
+    from curry.restaurants import load_restaurant_table
+    from curry.sketches import load_sketches
+    from curry.spatial import load_spatial_index
+    from curry.timeindex import load_time_index
+
+    loader.load_dataset(path, columns=[])
+    for load in [load_time_index, load_cube, load_geo_bins, load_sketches,
+                 load_courier_profiles, load_restaurant_table, load_spatial_index]:
+        load(path)
+
+
+def rebuild(path=DATA_PATH, version=None):
+    """ Finalidade da função:
+        1. Reconstruir fora das requisições o dataset limpo e as estruturas derivadas de uma versão dos dados
+           e trocá-los de uma vez pela versão servida (loader.publish)
+        2. Só uma reconstrução por vez: se já houver uma em andamento, não faz nada
+        3. Se o arquivo mudar durante a construção, a versão é descartada (a próxima verificação recomeça)
+        4. Com erro, as sessões continuam na versão publicada e a versão com erro não é tentada de novo
+        Os arquivos da versão anterior são apagados na próxima reconstrução (loader.remove_stale), depois
+        que nenhuma sessão precisa mais deles.
+        Input: caminho do arquivo, versão a construir (None = versão atual do arquivo)
+        Output: True se a nova versão foi publicada
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        return False
+
+    status = _status_of(path)
+    try:
+        version = version or data_version(path)
+        status['building'] = version
+        staged = loader.stage(path, version)
+        try:
+            warm(path)
+        except Exception as error:     # a thread do watcher não pode morrer: o erro fica no status
+            loader.discard_stage()
+            status['error'], status['failed'] = '{}: {}'.format(type(error).__name__, error), version
+            return False
+
+        if data_version(path) != version:
+            loader.discard_stage()
+            return False
+
+        loader.publish(path, version, staged)
+        status['published'], status['error'] = version, None
+        return True
+    finally:
+        status['building'] = None
+        _rebuild_lock.release()
+
+
+def append_pending(path=DATA_PATH, data_dir=WATCH_DIR, settle=WATCH_SECONDS):
+    """ Finalidade da função:
+        1. Acrescentar ao dataset (curry.append) os lotes CSV da pasta observada, em ordem de nome
+        2. Só entram arquivos sem alteração há settle segundos (cópias em andamento esperam)
+        3. Cada lote vai para a subpasta PROCESSED_DIR ou, se não puder ser acrescentado, REJECTED_DIR
+        Input: caminho do CSV do dataset, pasta observada, segundos sem alteração
+        Output: quantidade de lotes acrescentados
+    """
+    from curry.append import append_batch
+
+    appended = 0
+    for batch_path in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+        if time.time() - os.stat(batch_path).st_mtime < settle:
+            continue
+        try:
+            append_batch(batch_path, path)
+            folder, appended = PROCESSED_DIR, appended + 1
+        except Exception as error:     # lote inválido: fica separado e o erro no status
+            _status_of(path)['error'] = '{}: {}'.format(os.path.basename(batch_path), error)
+            folder = REJECTED_DIR
+        os.makedirs(os.path.join(data_dir, folder), exist_ok=True)
+        shutil.move(batch_path, os.path.join(data_dir, folder, os.path.basename(batch_path)))
+    return appended
+
+
+def check(path=DATA_PATH, data_dir=WATCH_DIR, settle=WATCH_SECONDS):
+    """ Finalidade da função:
+        1. Uma verificação do watcher: acrescentar os lotes da pasta observada e, se a versão do arquivo
+           for diferente da publicada, reconstruir e publicar a nova versão
+        2. O CSV só é reconstruído sem alteração há settle segundos (arquivo sendo copiado espera)
+        Input: caminho do CSV do dataset, pasta observada (None = só o CSV), segundos sem alteração
+        Output: True se uma nova versão foi publicada
+    """
+    status = _status_of(path)
+    if data_dir is not None and os.path.isdir(data_dir):
+        append_pending(path, data_dir, settle)
+
+    try:
+        version = data_version(path)
+        settled = time.time() - os.stat(path).st_mtime >= settle
+    except OSError:     # arquivo sendo trocado: fica para a próxima verificação
+        return False
+    if version in (status['published'], status['failed']) or not settled:
+        return False
+    return rebuild(path, version)
+
+
+def _status_of(path):
+    return _status.setdefault(path, {'published': None, 'building': None, 'error': None, 'failed': None})
+
+
+def _watch(path, data_dir, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            check(path, data_dir, interval)
+        except OSError as error:     # lote ou CSV trocado no meio da verificação: tenta de novo no próximo ciclo
+            _status_of(path)['error'] = str(error)
+
+
+def start_watcher(path=DATA_PATH, data_dir=WATCH_DIR, interval=WATCH_SECONDS):
+    """ Finalidade da função:
+        1. Iniciar (uma vez por processo e arquivo) a thread que observa o CSV e a pasta de lotes
+        2. A versão atual do arquivo passa a ser a versão publicada: as sessões só mudam de versão
+           quando a thread termina de montar a próxima (rebuild)
+        3. Com interval 0 (CURRY_WATCH_SECONDS=0) nada é iniciado e cada leitura segue a versão do arquivo
+        Input: caminho do CSV, pasta de lotes (None = só o CSV), intervalo entre verificações em segundos
+        Output: None
+    """
+    if not interval:
+        return
+
+    with _lock:
+        if path in _threads:
+            return
+        version = data_version(path)
+        loader.publish(path, version)
+        _status_of(path)['published'] = version
+        _threads[path] = threading.Thread(target=_watch, args=(path, data_dir, interval),
+                                          name='curry-watcher', daemon=True)
+        _threads[path].start()
+
+
+def watcher_status(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Informar o estado do watcher do arquivo
+        Input: caminho do arquivo
+        Output: dict com published, building, error e failed (None se o watcher não foi iniciado)
+    """
+    status = _status.get(path)
+    return None if status is None else dict(status)
@@ -0,0 +1,60 @@
+# Libraries
+import numpy as np
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def week_key(dates):
+    """ Finalidade da função:
+        1. Calcular, de forma numérica (sem formatar strings), a chave inteira da semana de cada data
+        2. A semana segue a máscara %U (semanas começando no domingo; dias antes do 1º domingo ficam na semana 0)
+           e a chave é ano * 100 + semana, para que anos diferentes não se misturem
+        Input: Series ou array de datas
+        Output: array int32 com a chave ano * 100 + semana
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    days = dates.astype('int64')
+    year_start = dates.astype('datetime64[Y]').astype('datetime64[D]').astype('int64')
+
+    year = dates.astype('datetime64[Y]').astype('int64') + 1970
+    weekday = (days + 4) % 7            # 01-01-1970 foi quinta-feira; 0 = domingo
+    week = (days - year_start + 7 - weekday) // 7
+    return (year * 100 + week).astype('int32')
+
+
+def week_label(keys):
+    """ Finalidade da função:
+        1. Formatar as chaves de semana (uma por grupo, não por pedido) para exibição nos gráficos
+        Input: array de chaves ano * 100 + semana
+        Output: lista de strings 'AAAA-SS'
+    """
+    return ['{}-{:02d}'.format(key // 100, key % 100) for key in keys]
+
+
+def weekly_orders(daily):
+    """ Finalidade da função:
+        1. Somar a quantidade de pedidos por semana a partir dos pedidos por dia
+        Input: Dataframe com Order_Date e orders (ex.: curry.timeindex.daily_orders)
+        Output: Dataframe com week_key, week_of_year e orders
+    """
+    df_aux = daily['orders'].groupby(week_key(daily['Order_Date'])).sum()
+    df_aux = df_aux.rename_axis('week_key').reset_index()
+    df_aux['week_of_year'] = week_label(df_aux['week_key'])
+    return df_aux
+
+
+def weekly_orders_per_courier(df1):
+    """ Finalidade da função:
+        1. Em uma única agregação por semana, contar os pedidos e os entregadores únicos
+        2. Dividir um pelo outro para obter os pedidos por entregador em cada semana
+        Não cria colunas no Dataframe recebido.
+        Input: Dataframe com Order_Date e Delivery_person_ID
+        Output: Dataframe com week_key, week_of_year, orders, couriers e order_by_deliver
+    """
+    df_aux = df1['Delivery_person_ID'].groupby(week_key(df1['Order_Date'])).agg(['size', 'nunique'])
+    df_aux.columns = ['orders', 'couriers']
+    df_aux = df_aux.rename_axis('week_key').reset_index()
+    df_aux['week_of_year'] = week_label(df_aux['week_key'])
+    df_aux['order_by_deliver'] = df_aux['orders'] / df_aux['couriers']
+    return df_aux
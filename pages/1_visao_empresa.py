@@ -1,190 +1,158 @@
 # Libraries
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+# (plotly e folium são importados dentro das funções que desenham os gráficos e o mapa)
+import numpy as np
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-from PIL import Image
-from haversine import haversine
+from curry.cube import filter_cube, load_cube
+from curry.geobins import MAX_ZOOM, MIN_ZOOM, heat_points, load_geo_bins
+from curry.loader import STREAM_CHUNK_ROWS, load_window
+from curry.metrics import city_centroids, city_traffic_orders, traffic_share
+from curry.sketches import delivery_time_percentiles, load_sketches, sketch_centroids, sketch_orders_per_courier
+from curry.timeindex import daily_orders, load_time_index, window_totals
+from curry.watcher import start_watcher
+from curry.weekly import weekly_orders, weekly_orders_per_courier
+from ui.charts import plotly_chart, time_series_chart
+from ui.panels import cache_caption, chart_result, data_caption, filter_state, panel_result, view_selector
+from ui.sidebar import sidebar_filters
 
 st.set_page_config(page_title='Visão Empresa', page_icon='📈', layout='wide')
 
 # ====================================================================================
 # Funções
 # ====================================================================================
-def clean_code(df1):
-    """ Esta função tem a finalidade de limpar e formatar o dataframe.
-        Tipos de limpeza:
-        1. Remoção dos dados NaN
-        2. Mudança do tipo dos dados
-        3. Remoção dos espaços em branco
-        4. Formatação das colunas de tempo
-        Input: Dataframe
-        Output: Dataframe
-    """
-
-    # Limpando e formatando Dataframe
-    ## criterio para selecionar as linhas diferentes de NaN
-    linhas = (df1['Delivery_person_Age'] != 'NaN ') & (df1['multiple_deliveries'] != 'NaN ') & (df1['Road_traffic_density'] != 'NaN ') & (df1['City'] != 'NaN ') & (df1['Festival'] != 'NaN ')
-
-    ## elimitar as linhas com NaN
-    df1 = df1.loc[linhas, :]
-
-    ## aterar o tipo para o apropriado
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype(int)
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype(float)
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format = '%d-%m-%Y')
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype(int)
-
-    ## Removendo espaços em branco
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()   # o .str acessa o conteúdo da series df1.loc[:, 'ID'] como uma string, permitindo o uso do strip, que só é aplicado sobre strings
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-
-    ## Limpando a coluna Time_taken
-    ### lambda x: x**2 --> f(x) = x^2
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(lambda x: x.split('(min) ')[1])
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype(int)
-    return df1
-
-
-def order_metric(df1):
+def order_metric(time_index, date_range, traffic_options):
     """ Finalidade da função:
-        1. Agrupar a quantidade de entregas por dia
-        2. Plotar um gráfico de barras mostrando as entregas por dia
-        Input: Dataframe
+        1. Obter a quantidade de entregas por dia pelas somas de prefixo do índice temporal
+        2. Plotar um gráfico de barras mostrando as entregas por dia (agrupadas por semana ou mês em janelas longas)
+        Input: índice temporal, período (início, fim), condições de trânsito
         Output: Fig
     """
-    # filtrando colunas
-    cols = ['ID', 'Order_Date']
-
-    # seleção das colunas e agrupando por data
-    df_aux = df1.loc[:, cols].groupby('Order_Date').count().reset_index()
-    df_aux.head()
+    # entregas por dia na janela (diferença entre prefixos consecutivos)
+    df_aux = daily_orders(time_index, date_range, traffic_options).rename(columns={'orders': 'ID'})
 
     # plotar grafico de barra
-    fig = px.bar(df_aux, x='Order_Date', y='ID')
+    fig = time_series_chart(df_aux, x='Order_Date', y='ID', kind='bar')
     return fig
 
 
-def traffic_order_share(df1):
+def traffic_order_share(cube):
     """ Finalidade da função:
-        1. Agrupar a quantidade de entregas por densidade de tráfego
+        1. Agrupar a quantidade de entregas por densidade de tráfego (a partir do cubo já filtrado)
         2. Plotar um gráfico de pizza mostrando a quantidade relativa de entregas em cada densidade de tráfego
-        Input: Dataframe
+        Input: cubo
         Output: Fig
     """
-    # filtrando colunas
-    cols = ['ID', 'Road_traffic_density']
-
-    # agrupa df por tráfego e conta os IDs
-    df_aux = df1.loc[:, cols].groupby(['Road_traffic_density']).count().reset_index()
+    import plotly.express as px
 
-    # cria nova coluna com o valor relativo das entregas por tráfego
-    df_aux['relative_deliv'] = df_aux['ID'] / (df_aux['ID'].sum())
+    # somando as células do cubo por tráfego, com o valor relativo das entregas
+    df_aux = traffic_share(cube)
 
     # gráfico de pizza
     fig = px.pie(df_aux, values='relative_deliv', names='Road_traffic_density')
     return fig
 
 
-def traffic_order_city(df1):
+def traffic_order_city(cube):
     """ Finalidade da função:
-        1. Agrupar a quantidade de entregas por cidade e por densidade de tráfego
+        1. Agrupar a quantidade de entregas por cidade e por densidade de tráfego (a partir do cubo já filtrado)
         2. Plotar um gráfico de bolha mostrando as entregas por dia
-        Input: Dataframe
+        Input: cubo
         Output: Fig
     """
-    # filtrando colunas
-    cols = ['ID', 'City', 'Road_traffic_density']
+    import plotly.express as px
 
     # total de entregas argupadas por cidade e tráfego
-    df_aux = df1.loc[:, cols].groupby(['City', 'Road_traffic_density']).count().reset_index()
+    df_aux = city_traffic_orders(cube)
 
     # gráfico de bolha
     fig = px.scatter(df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
     return fig
 
 
-def order_by_week(df1):
+def order_by_week(time_index, date_range, traffic_options):
     """ Finalidade da função:
-        1. Cria uma nova coluna para indicar a qual semana do ano a data do podido se refere
-        2. Agrupa os pedidos por semana
-        3. Plota um gráfico de linha mostrando as entregas por semana
-        Input: Dataframe
+        1. Obtém os pedidos por dia pelo índice temporal e os soma por semana (chave inteira de semana)
+        2. Plota um gráfico de linha mostrando as entregas por semana
+        Input: índice temporal, período (início, fim), condições de trânsito
         Output: Fig
     """
-    # criar a coluna week_of_year
-    df1['week_of_year'] = df1['Order_Date'].dt.strftime('%U')      # pega Order_Date (no formato datetime) e aplica .streftime para indicar qual a semana (máscara %U) do ano é aquela data
-
-    # agrupa os pedidos por semana
-    df_aux = df1.loc[:, ['ID', 'week_of_year']].groupby(['week_of_year']).count().reset_index()
+    # pedidos por semana a partir dos pedidos por dia (uma linha por data, não por pedido)
+    df_aux = weekly_orders(daily_orders(time_index, date_range, traffic_options))
 
     # gráfico de linha
-    fig = px.line(df_aux, x='week_of_year', y='ID')
+    fig = time_series_chart(df_aux, x='week_of_year', y='orders')
     return fig
 
 
 def order_share_by_week(df1):
     """ Finalidade da função:
-        1. Calcula a média de entregas por entregador em cada semana
+        1. Calcula a média de entregas por entregador em cada semana (pedidos e entregadores únicos
+           saem de uma única agregação, sem alterar o dataframe recebido)
         2. Plota um gráfico de linha mostrando as entregas médias por entregador por semana
         Input: Dataframe
         Output: Fig
     """
-    # pedidos por semana
-    cols = ['ID', 'week_of_year']
-    df_aux01 = df1.loc[:, cols].groupby(['week_of_year']).count().reset_index()
+    df_aux = weekly_orders_per_courier(df1)
 
-    # entregadores unicos por semana
-    cols = ['Delivery_person_ID', 'week_of_year']
-    df_aux02 = df1.loc[:, cols].groupby(['week_of_year']).nunique().reset_index()      # retorna quantos entregadores únicos existem em cada semana
+    # gráfico de linha
+    fig = time_series_chart(df_aux, x='week_of_year', y='order_by_deliver')
+    return fig
 
-    # juntar os dois dataframes
-    df_aux = pd.merge(df_aux01, df_aux02, how='inner')
 
-    # fazer a divisão das colunas
-    df_aux['order_by_deliver'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+def order_share_by_week_sketch(sketches, time_index, date_range, traffic_options):
+    """ Finalidade da função:
+        1. Mesmo gráfico de order_share_by_week sem ler os pedidos (modo em blocos): pedidos por semana
+           pelo índice temporal e entregadores distintos por semana pelo HyperLogLog
+        Input: sketches, índice temporal, período (início, fim), condições de trânsito
+        Output: Fig
+    """
+    daily = daily_orders(time_index, date_range, traffic_options)
+    df_aux = sketch_orders_per_courier(sketches, daily, date_range, traffic_options)
 
     # gráfico de linha
-    fig = px.line(df_aux, x='week_of_year', y='order_by_deliver')
+    fig = time_series_chart(df_aux, x='week_of_year', y='order_by_deliver')
     return fig
 
 
-def country_map(df1):
+def country_map(centroids, df_heat, zoom):
     """ Finalidade da função:
-        1. Calcula a mediana e o desvio padrão das latitudes e longitudes dos locais de entrega em cada cidade, para cada tráfego
-        2. Plota um mapa com as localizações centrais de cada cidade indicando o tipo de tráfego 
-        Input: Dataframe
+        1. Plota um mapa de calor das entregas a partir da grade pré-calculada, com o tamanho da célula
+           ligado ao nível de zoom (o número de pontos enviados ao navegador é limitado)
+        2. Marca as localizações centrais de cada cidade indicando o tipo de tráfego
+        Input: pontos centrais (curry.metrics.city_centroids ou, no modo em blocos, curry.sketches.sketch_centroids),
+               células da grade (curry.geobins.heat_points), nível de zoom efetivo
         Output: None
     """
-    # filtrando colunas
-    cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
-
-    # encontra a mediana das latitudes e longitudes (ponto central) em cada cidade, para cada tráfego
-    df_aux = df1.loc[:, cols].groupby(['City', 'Road_traffic_density']).median().reset_index()
+    import folium
+    from folium.plugins import HeatMap
+    from streamlit_folium import folium_static
 
     # mostra o país
     latitude = 21.382561028263332
     longitude = 78.88947366027652
-    map = folium.Map(location=[latitude, longitude], zoom_start=5)
+    map = folium.Map(location=[latitude, longitude], zoom_start=zoom)
+
+    HeatMap(df_heat.to_numpy().tolist(), name='Entregas').add_to(map)
 
-    for index, location_info in df_aux.iterrows():
+    for index, location_info in centroids.iterrows():
         folium.Marker([location_info['Delivery_location_latitude'], location_info['Delivery_location_longitude']],
                     popup=location_info['City'],
                     icon=folium.Icon(color="blue", icon="info-sign")).add_to(map)
     folium_static(map, width=1024, height=600)
+
+
 # ======================================================= Início da estrutura lógica do código =====================================
+# Watcher do arquivo de dados: novas versões são montadas em segundo plano e trocadas de uma vez
+start_watcher()
+
+# Colunas do dataset usadas nesta página (lidas depois dos filtros, só nas partições escolhidas)
+COLUMNS = ['Delivery_person_ID', 'Order_Date', 'Road_traffic_density', 'City',
+           'Delivery_location_latitude', 'Delivery_location_longitude']
 
-# Import dataset
-df = pd.read_csv('./datasets/train.csv')
+# Cubo pré-agregado (data × cidade × tráfego × festival × tipo de pedido × clima) para os gráficos de contagem
+cube = load_cube()
 
-# Limpando os dados
-df1 = clean_code(df)
+# Índice temporal (somas de prefixo por dia) para a janela de datas
+time_index = load_time_index()
 
 
 # ====================================================================================
@@ -192,77 +160,81 @@ df1 = clean_code(df)
 # ====================================================================================
 st.header('Marketplace - Visão Empresa')
 
-#image_path = '/home/ezequiel/Documentos/Comunidade_DS/Analise_dados_com_python/logo.jpeg'
-image = Image.open('logo.jpeg')      # Image.open bem da lib PIL
-st.sidebar.image(image, width=120)
-
-st.sidebar.markdown('# Curry Company')
-st.sidebar.markdown('## Fastest Delivery in Town')
-
-st.sidebar.markdown("""___""")
+date_slider, traffic_options = sidebar_filters(time_index)
 
-st.sidebar.markdown('## Selecione uma data limite')
+# Import dataset já limpo apenas com as partições (mês × cidade × trânsito) do período e do trânsito escolhidos.
+# No modo em blocos (CURRY_CHUNK_ROWS) o dataset não é carregado e a página usa só os agregados.
+df1 = load_window(date_slider, traffic_options, columns=COLUMNS) if not STREAM_CHUNK_ROWS else None
 
-date_slider = st.sidebar.slider(
-    'Até qual valor?',
-    value=pd.datetime(2022, 4, 13),
-    min_value=pd.datetime(2022, 2, 11),
-    max_value=pd.datetime(2022, 4, 6),
-    format='DD-MM-YYYY')
-
-st.sidebar.markdown("""___""")
-
-traffic_options = st.sidebar.multiselect(
-    'Quais as condições de trânsito?',
-    ['Low', 'Medium', 'High', 'Jam'],
-    default=['Low', 'Medium', 'High', 'Jam']
-)
-
-st.sidebar.markdown("""___""")
-st.sidebar.markdown('### Powered by Comunidade DS')
-
-# Filtro de data
-linhas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas, :]
-
-# Filtro de traffic density
-linhas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas, :]
+# Mesmos filtros aplicados às células do cubo
+cube = filter_cube(cube, date_slider, traffic_options)
 
 # ====================================================================================
 # Layout do Streamlit
 # ====================================================================================
-tab1, tab2, tab3 = st.tabs(['Visão Gerencial', 'Visão Tática', 'Visão Geográfica'])
+VIEWS = ['Visão Gerencial', 'Visão Tática', 'Visão Geográfica']
+view = view_selector(VIEWS, key='view')
+
+# estado dos filtros: os gráficos só são recalculados quando ele (ou a versão dos dados) muda
+state = filter_state(date_slider, traffic_options)
+
+if view == 'Visão Gerencial':
+    with st.container():
+        # totais do período pelas somas de prefixo (sem varrer os pedidos)
+        totals = window_totals(time_index, date_slider, traffic_options)
+        # percentis do tempo de entrega pelos t-digests de cada dia (sem ordenar os pedidos)
+        percentiles = panel_result('delivery_time_percentiles', state, delivery_time_percentiles,
+                                   load_sketches(), date_slider, traffic_options)
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric('Pedidos no período', int(totals['orders']))
+        col2.metric('Tempo médio de entrega', np.round(totals['mean_delivery_time'], 2))
+        for col, q in zip([col3, col4, col5], [0.5, 0.9, 0.99]):
+            col.metric('Tempo de entrega p{:g}'.format(q * 100), np.round(percentiles[q].iloc[0], 2) if len(percentiles) else '-')
 
-with tab1:
     with st.container():
         st.markdown('# Orders by Day')
-        fig = order_metric(df1)
-        st.plotly_chart(fig, use_container_width=True)        
+        fig, payload = chart_result('order_metric', state, order_metric, time_index, date_slider, traffic_options)
+        plotly_chart(fig, payload)
     
     with st.container():
         col1, col2 = st.columns(2)
         with col1:
             st.header('Traffic Order Share')
-            fig = traffic_order_share(df1)
-            st.plotly_chart(fig, use_container_width=True)           
+            fig, payload = chart_result('traffic_order_share', state, traffic_order_share, cube)
+            plotly_chart(fig, payload)
             
         with col2:
             st.header('Traffic Order City')
-            fig = traffic_order_city(df1)
-            st.plotly_chart(fig, use_container_width=True)
+            fig, payload = chart_result('traffic_order_city', state, traffic_order_city, cube)
+            plotly_chart(fig, payload)
                  
-with tab2:
+elif view == 'Visão Tática':
     with st.container():
         st.markdown('# Order by Week')
-        fig = order_by_week(df1)
-        st.plotly_chart(fig, use_container_width=True)     
+        fig, payload = chart_result('order_by_week', state, order_by_week, time_index, date_slider, traffic_options)
+        plotly_chart(fig, payload)
 
     with st.container():
         st.markdown('# Order Share by Week')
-        fig = order_share_by_week(df1)
-        st.plotly_chart(fig, use_container_width=True)   
-
-with tab3:
+        if df1 is not None:
+            fig, payload = chart_result('order_share_by_week', state, order_share_by_week, df1)
+        else:
+            fig, payload = chart_result('order_share_by_week_sketch', state, order_share_by_week_sketch,
+                                        load_sketches(), time_index, date_slider, traffic_options)
+        plotly_chart(fig, payload)
+
+else:
     st.markdown('# Country Map')
-    country_map(df1)
\ No newline at end of file
+    zoom = st.slider('Nível de zoom do mapa', min_value=MIN_ZOOM, max_value=MAX_ZOOM, value=5)
+
+    # grade das localizações de entrega carregada apenas quando o mapa é exibido
+    geo_bins = load_geo_bins()
+    df_heat, zoom = panel_result('heat_points', state + (zoom,), heat_points, geo_bins, zoom, date_slider, traffic_options)
+    if df1 is not None:
+        centroids = panel_result('city_centroids', state, city_centroids, df1)
+    else:
+        centroids = panel_result('sketch_centroids', state, sketch_centroids, load_sketches(), date_slider, traffic_options)
+    country_map(centroids, df_heat, zoom)
+
+cache_caption()
+data_caption()
@@ -1,111 +1,73 @@
 # Libraries
-import pandas as pd
 import streamlit as st
-from PIL import Image
-from haversine import haversine
+from curry.couriers import courier_rows, load_courier_profiles, search_couriers
+from curry.cube import filter_cube, load_cube, rollup
+from curry.loader import STREAM_CHUNK_ROWS, load_dataset, load_window
+from curry.ranking import top_couriers
+from curry.timeindex import load_time_index, row_slice
+from curry.watcher import start_watcher
+from ui.panels import cache_caption, chunked_notice, data_caption, filter_state, lazy_panel, panel_result
+from ui.sidebar import sidebar_filters
+from ui.tables import paged_dataframe
 
 st.set_page_config(page_title='Visão Entregadores', page_icon=':bike:', layout='wide')
 
 # ====================================================================================
 # Funções
 # ====================================================================================
-def clean_code(df1):
-    """ Esta função tem a finalidade de limpar e formatar o dataframe.
-        Tipos de limpeza:
-        1. Remoção dos dados NaN
-        2. Mudança do tipo dos dados
-        3. Remoção dos espaços em branco
-        4. Formatação das colunas de tempo
-        Input: Dataframe
+def top_delivers(df1, ascend, metric='max', k=10):
+    """ Finalidade da função:
+        1. Selecionar os k entregadores de cada cidade pela métrica escolhida (curry.ranking.top_couriers)
+        2. ascend=True retorna os melhores: menor tempo de entrega ou, para 'rating', maior avaliação
+        Input: Dataframe, ascend, métrica ('max', 'mean', 'median' ou 'rating'), k
         Output: Dataframe
     """
-
-    # Limpando e formatando Dataframe
-    ## criterio para selecionar as linhas diferentes de NaN
-    linhas = (df1['Delivery_person_Age'] != 'NaN ') & (df1['multiple_deliveries'] != 'NaN ') & (df1['Road_traffic_density'] != 'NaN ') & (df1['City'] != 'NaN ') & (df1['Festival'] != 'NaN ')
-
-    ## elimitar as linhas com NaN
-    df1 = df1.loc[linhas, :]
-
-    ## aterar o tipo para o apropriado
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype(int)
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype(float)
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format = '%d-%m-%Y')
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype(int)
-
-    ## Removendo espaços em branco
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()   # o .str acessa o conteúdo da series df1.loc[:, 'ID'] como uma string, permitindo o uso do strip, que só é aplicado sobre strings
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-
-    ## Limpando a coluna Time_taken
-    ### lambda x: x**2 --> f(x) = x^2
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(lambda x: x.split('(min) ')[1])
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype(int)
-    return df1
-
-def top_delivers(df1, ascend):
-    cols = ['Delivery_person_ID', 'Time_taken(min)', 'City']
-    df_aux = df1.loc[:, cols].groupby(['City','Delivery_person_ID']).max().sort_values(by=['City', 'Time_taken(min)'], ascending=ascend).reset_index()
-
-    df_aux01 = df_aux.loc[df_aux['City'] == 'Metropolitian', :].head(10)
-    df_aux02 = df_aux.loc[df_aux['City'] == 'Urban', :].head(10)
-    df_aux03 = df_aux.loc[df_aux['City'] == 'Semi-Urban', :].head(10)
-
-    df_aux = pd.concat([df_aux01, df_aux02, df_aux03]).reset_index(drop=True)
+    ascending = not ascend if metric == 'rating' else ascend
+    df_aux = top_couriers(df1, k=k, metric=metric, ascending=ascending)
     return df_aux
     
 # ======================================================= Início da estrutura lógica do código =====================================
-# Import dataset
-df = pd.read_csv('./datasets/train.csv')
-
-# Limpando os dados
-df1 = clean_code(df)
+# Watcher do arquivo de dados: novas versões são montadas em segundo plano e trocadas de uma vez
+start_watcher()
 
+# Critérios de ranking exibidos na página -> métrica de curry.ranking
+RANKING_METRICS = {
+    'Tempo máximo de entrega': 'max',
+    'Tempo médio de entrega': 'mean',
+    'Tempo mediano de entrega': 'median',
+    'Avaliação média': 'rating',
+}
 
-# ====================================================================================
-# Barra lateral do Streamlit
-# ====================================================================================
-st.header('Marketplace - Visão Entragadores')
+# Colunas do dataset usadas nesta página (lidas depois dos filtros, só nas partições escolhidas)
+COLUMNS = ['Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition',
+           'Order_Date', 'Road_traffic_density', 'City', 'Time_taken(min)']
 
-#image_path = '/home/ezequiel/Documentos/Comunidade_DS/Analise_dados_com_python/logo.jpeg'
-image = Image.open('logo.jpeg')      # Image.open bem da lib PIL
-st.sidebar.image(image, width=120)
+# Cubo pré-agregado para as avaliações por trânsito e por clima
+cube = load_cube()
 
-st.sidebar.markdown('# Curry Company')
-st.sidebar.markdown('## Fastest Delivery in Town')
-st.sidebar.markdown("""___""")
+# Índice temporal (somas de prefixo por dia) para a janela de datas
+time_index = load_time_index()
 
-st.sidebar.markdown('## Selecione uma data limite')
+# Perfis dos entregadores (agregados uma vez por versão dos dados) e índice das linhas de cada um.
+# No modo em blocos (CURRY_CHUNK_ROWS) não há pedidos em memória: só os painéis do cubo são exibidos
+courier_store = load_courier_profiles() if not STREAM_CHUNK_ROWS else None
 
-date_slider = st.sidebar.slider(
-    'Até qual valor?',
-    value=pd.datetime(2022, 4, 13),
-    min_value=pd.datetime(2022, 2, 11),
-    max_value=pd.datetime(2022, 4, 6),
-    format='DD-MM-YYYY')
 
-st.sidebar.markdown("""___""")
+# ====================================================================================
+# Barra lateral do Streamlit
+# ====================================================================================
+st.header('Marketplace - Visão Entragadores')
 
-traffic_options = st.sidebar.multiselect(
-    'Quais as condições de trânsito?',
-    ['Low', 'Medium', 'High', 'Jam'],
-    default=['Low', 'Medium', 'High', 'Jam']
-)
+date_slider, traffic_options = sidebar_filters(time_index)
 
-st.sidebar.markdown("""___""")
-st.sidebar.markdown('### Powered by Comunidade DS')
+# Import dataset já limpo apenas com as partições (mês × cidade × trânsito) do período e do trânsito escolhidos
+df1 = load_window(date_slider, traffic_options, columns=COLUMNS) if not STREAM_CHUNK_ROWS else None
 
-# Filtro de data
-linhas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas, :]
+# Mesmos filtros aplicados às células do cubo
+cube = filter_cube(cube, date_slider, traffic_options)
 
-# Filtro de traffic density
-linhas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas, :]
+# estado dos filtros: os rankings só são recalculados quando ele (ou a versão dos dados) muda
+state = filter_state(date_slider, traffic_options)
 
 # ====================================================================================
 # Layout do Streamlit
@@ -116,55 +78,99 @@ with tab1:
 
     with st.container():
         st.title('Overall Metrics')
-        col1, col2, col3, col4 = st.columns(4, gap='large')
-        with col1:
-            maior_idade = df1.loc[:, "Delivery_person_Age"].max()
-            col1.metric('Maior idade', maior_idade)            
-        with col2:
-            menor_idade = df1.loc[:, "Delivery_person_Age"].min()
-            col2.metric('Menor idade', menor_idade)
-        with col3:   
-            melhor_condicao = df1.loc[:, "Vehicle_condition"].max()
-            col3.metric('Melhor condição do veículo', melhor_condicao)
-        with col4:
-            pior_condicao = df1.loc[:, "Vehicle_condition"].min()
-            col4.metric('Pior condição do veículo', pior_condicao)
+        if df1 is None:
+            chunked_notice()
+        else:
+            col1, col2, col3, col4 = st.columns(4, gap='large')
+            with col1:
+                maior_idade = df1.loc[:, "Delivery_person_Age"].max()
+                col1.metric('Maior idade', maior_idade)            
+            with col2:
+                menor_idade = df1.loc[:, "Delivery_person_Age"].min()
+                col2.metric('Menor idade', menor_idade)
+            with col3:   
+                melhor_condicao = df1.loc[:, "Vehicle_condition"].max()
+                col3.metric('Melhor condição do veículo', melhor_condicao)
+            with col4:
+                pior_condicao = df1.loc[:, "Vehicle_condition"].min()
+                col4.metric('Pior condição do veículo', pior_condicao)
         st.markdown("""___""")
     
     with st.container():
         st.title('Avaliações')
         col1, col2 = st.columns(2, gap='large')
         with col1:
-            st.markdown('##### Avaliação média por entregador')
-            df_avg_ratings_per_deliver = df1.loc[:, ['Delivery_person_Ratings', 'Delivery_person_ID']].groupby(['Delivery_person_ID']).mean().reset_index()
-            st.dataframe(df_avg_ratings_per_deliver)
+            st.markdown('##### Avaliação média por entregador (todo o histórico)')
+            if courier_store is None:
+                chunked_notice()
+            else:
+                df_avg_ratings_per_deliver = courier_store['profiles'].loc[:, ['mean_rating']].reset_index()
+                paged_dataframe(df_avg_ratings_per_deliver, key='ratings', sort_by='mean_rating', ascending=False,
+                                search_column='Delivery_person_ID')
             
         with col2:
             st.markdown('##### Avaliação média por condição de trânsito') 
-            cols = ['Delivery_person_Ratings', 'Road_traffic_density']
-            df_avg_std_rating_by_traffic = df1.loc[:, cols].groupby(['Road_traffic_density']).agg(['mean', 'std'])
-            ## mudança dos nomes das colunas
-            df_avg_std_rating_by_traffic.columns = ['Mean', 'std']
-            df_avg_std_rating_by_traffic = df_avg_std_rating_by_traffic.reset_index()
+            df_avg_std_rating_by_traffic = panel_result('rating_by_traffic', state, rollup, cube, ['Road_traffic_density'])
+            ## seleção e mudança dos nomes das colunas
+            df_avg_std_rating_by_traffic = df_avg_std_rating_by_traffic.loc[:, ['Road_traffic_density', 'mean_rating', 'std_rating']]
+            df_avg_std_rating_by_traffic.columns = ['Road_traffic_density', 'Mean', 'std']
             st.dataframe(df_avg_std_rating_by_traffic)
 
             st.markdown('##### Avaliação média por clima')
-            cols = ['Delivery_person_Ratings', 'Weatherconditions']
-            df_avg_std_rating_by_weather = df1.loc[:, cols].groupby(['Weatherconditions']).agg(['mean', 'std'])
-            df_avg_std_rating_by_weather.columns = ['mean', 'std']
-            df_avg_std_rating_by_weather = df_avg_std_rating_by_weather.reset_index()
+            df_avg_std_rating_by_weather = panel_result('rating_by_weather', state, rollup, cube, ['Weatherconditions'])
+            df_avg_std_rating_by_weather = df_avg_std_rating_by_weather.loc[:, ['Weatherconditions', 'mean_rating', 'std_rating']]
+            df_avg_std_rating_by_weather.columns = ['Weatherconditions', 'mean', 'std']
             st.dataframe(df_avg_std_rating_by_weather)
         st.markdown("""___""")
 
     with st.container():
         st.title('Velocidade de entrega')
-        col1, col2 = st.columns(2, gap='large')
-        with col1:
-            st.markdown('##### Top entregadores mais rápidos')
-            df_aux = top_delivers(df1, ascend=True)
-            st.dataframe(df_aux)
+        if df1 is None:
+            chunked_notice()
+        else:
+            col1, col2 = st.columns(2, gap='large')
+            with col1:
+                ranking = st.selectbox('Critério do ranking', list(RANKING_METRICS))
+            with col2:
+                top_k = st.number_input('Entregadores por cidade', min_value=1, max_value=100, value=10)
+            metric = RANKING_METRICS[ranking]
+
+            col1, col2 = st.columns(2, gap='large')
+            with col1:
+                st.markdown('##### Top entregadores mais rápidos' if metric != 'rating' else '##### Top entregadores mais bem avaliados')
+                df_aux = panel_result('top_fast', state + (metric, int(top_k)), top_delivers, df1, ascend=True, metric=metric, k=int(top_k))
+                paged_dataframe(df_aux, key='top_fast', sort_by='City', search_column='Delivery_person_ID')
+
+            with col2:
+                st.markdown('##### Top entregadores mais lentos' if metric != 'rating' else '##### Top entregadores pior avaliados')
+                df_aux = panel_result('top_slow', state + (metric, int(top_k)), top_delivers, df1, ascend=False, metric=metric, k=int(top_k))
+                paged_dataframe(df_aux, key='top_slow', sort_by='City', search_column='Delivery_person_ID')
 
-        with col2:
-            st.markdown('##### Top entregadores mais lentos')
-            df_aux = top_delivers(df1, ascend=False)
-            st.dataframe(df_aux)
\ No newline at end of file
+    with st.container():
+        if lazy_panel('Detalhamento do entregador', key='show_courier'):
+            if courier_store is None:
+                chunked_notice()
+            else:
+                # busca pelo início do ID no servidor: só os IDs encontrados vão para o seletor
+                courier_query = st.text_input('Buscar Delivery_person_ID', key='courier_query')
+                matches = search_couriers(courier_store, courier_query)
+                if not courier_query.strip():
+                    st.info('Digite o início do ID de um entregador (ex.: {}).'.format(courier_store['profiles'].index[0]))
+                elif not matches:
+                    st.info('Nenhum entregador encontrado.')
+                else:
+                    courier_id = st.selectbox('Entregador', matches)
+
+                    st.dataframe(courier_store['profiles'].loc[[courier_id], :].reset_index())
+
+                    # pedidos do entregador no período, pelas posições guardadas no perfil (sem varrer o dataset)
+                    positions = courier_rows(courier_store, courier_id, row_slice(time_index, date_slider))
+                    # dataset sem filtros, carregado só com a seção aberta (as posições são do dataset inteiro)
+                    df_all = load_dataset(columns=COLUMNS)
+                    df_aux = df_all.iloc[positions]
+                    df_aux = df_aux.loc[df_aux['Road_traffic_density'].isin(traffic_options), :]
+                    st.markdown('##### Pedidos no período')
+                    paged_dataframe(df_aux, key='courier_orders', sort_by='Order_Date')
+
+cache_caption()
+data_caption()
@@ -1,104 +1,92 @@
 # Libraries
-import pandas as pd
-import streamlit as st
+# (plotly é importado dentro das funções que desenham os gráficos)
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from PIL import Image
-from haversine import haversine
+import streamlit as st
+from curry.cube import filter_cube, load_cube, rollup
+from curry.loader import STREAM_CHUNK_ROWS, load_dataset, load_window
+from curry.metrics import festival_delivery_time, mean_distance, mean_distance_by_city, unique_couriers
+from curry.restaurants import load_restaurant_table, search_restaurants
+from curry.spatial import load_spatial_index, nearest_restaurants, orders_near
+from curry.timeindex import load_time_index
+from curry.watcher import start_watcher
+from ui.charts import plotly_chart
+from ui.panels import cache_caption, chart_result, chunked_notice, data_caption, filter_state, lazy_panel, panel_result
+from ui.sidebar import sidebar_filters
+from ui.tables import paged_dataframe
 
 st.set_page_config(page_title='Visão Restaurantes', page_icon='🍝', layout='wide')
 
 # ====================================================================================
 # Funções
 # ====================================================================================
-def clean_code(df1):
-    """ Esta função tem a finalidade de limpar e formatar o dataframe.
-        Tipos de limpeza:
-        1. Remoção dos dados NaN
-        2. Mudança do tipo dos dados
-        3. Remoção dos espaços em branco
-        4. Formatação das colunas de tempo
-        Input: Dataframe
-        Output: Dataframe
-    """
-
-    # Limpando e formatando Dataframe
-    ## criterio para selecionar as linhas diferentes de NaN
-    linhas = (df1['Delivery_person_Age'] != 'NaN ') & (df1['multiple_deliveries'] != 'NaN ') & (df1['Road_traffic_density'] != 'NaN ') & (df1['City'] != 'NaN ') & (df1['Festival'] != 'NaN ')
-
-    ## elimitar as linhas com NaN
-    df1 = df1.loc[linhas, :]
-
-    ## aterar o tipo para o apropriado
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype(int)
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype(float)
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format = '%d-%m-%Y')
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype(int)
-
-    ## Removendo espaços em branco
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()   # o .str acessa o conteúdo da series df1.loc[:, 'ID'] como uma string, permitindo o uso do strip, que só é aplicado sobre strings
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-
-    ## Limpando a coluna Time_taken
-    ### lambda x: x**2 --> f(x) = x^2
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(lambda x: x.split('(min) ')[1])
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype(int)
-    return df1
-
 def distance(df1, fig):
-    cols = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
-    df1['Avg_Distance'] = df1.loc[:, cols].apply(lambda x: haversine(
-                                                        (x['Restaurant_latitude'], x['Restaurant_longitude']),
-                                                        (x['Delivery_location_latitude'], x['Delivery_location_longitude'])), axis=1)
+    """ Finalidade da função:
+        1. Usar a coluna Delivery_distance, calculada uma única vez na carga do dataset
+        2. fig=False: retorna a distância média; fig=True: gráfico de pizza da distância média por cidade
+        Input: Dataframe, fig
+        Output: float ou Fig
+    """
     if fig == False:
-        avg_distance = np.round(df1['Avg_Distance'].mean(), 2)
+        avg_distance = mean_distance(df1)
         return avg_distance
     else:
-        avg_distance = df1.loc[:, ['City', 'Avg_Distance']].groupby(['City']).mean().reset_index()
-        fig = go.Figure(data=[go.Pie(labels=avg_distance['City'], values=avg_distance['Avg_Distance'], pull=[0, 0.1, 0])])
+        import plotly.graph_objects as go
+
+        avg_distance = mean_distance_by_city(df1)
+        fig = go.Figure(data=[go.Pie(labels=avg_distance['City'], values=avg_distance['Delivery_distance'], pull=[0, 0.1, 0])])
         return fig
 
-def avg_std_time_delivery(df1, statistics, festival):
+def avg_std_time_delivery(cube, statistics, festival):
     """ 
     Esta função calcula o tempo médio e o desvio padrão do tempo tempo de entrega.
     Parâmetros:
         Input:
-            - df: Dataframe com os dados necessários para o cálculo
+            - cube: cubo pré-agregado (já filtrado) com as somas do tempo de entrega
             - statistics: tipo de operação estatística que será retornada
                 Opções: 'mean_delivery_time' ou 'std_delivery_time'
             - festival: uma string com 'Yes' or 'No' indicando se os pedidos foram feitos, ou não, durante o festival
         Output:
             - df: Dataframe com 2 colunas e 1 linha
     """
-    cols = ['Time_taken(min)', 'Festival']
-    lines = df1['Festival'] == festival
-    df_aux = df1.loc[lines, cols].groupby(['Festival']).agg({'Time_taken(min)': ['mean','std']})
-    df_aux.columns = ['mean_delivery_time', 'std_delivery_time']
-    df_aux = df_aux.reset_index()
-    df_aux = np.round(df_aux[statistics], 2)
+    df_aux = festival_delivery_time(cube, statistics, festival)
     return df_aux
 
-def avg_std_time_on_traffic(df1):
-    cols = ['Time_taken(min)', 'City', 'Road_traffic_density']
-    df_aux = df1.loc[:, cols].groupby(['City', 'Road_traffic_density']).agg({'Time_taken(min)': ['mean','std']})
-    df_aux.columns = ['mean_delivery_time', 'std_delivery_time']
-    df_aux = df_aux.reset_index()
+def time_by_city(cube):
+    """ Finalidade da função:
+        1. Calcular a média e o desvio padrão do tempo de entrega por cidade (a partir do cubo já filtrado)
+        2. Plotar um gráfico de barras com o desvio padrão como barra de erro
+        Input: cubo
+        Output: Fig
+    """
+    import plotly.graph_objects as go
+
+    df_aux = rollup(cube, ['City'])
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name = 'Control', x=df_aux['City'], y=df_aux['mean_delivery_time'], error_y=dict(type='data', array=df_aux['std_delivery_time'])))
+    fig.update_layout(barmode='group')
+    return fig
+
+def avg_std_time_on_traffic(cube):
+    import plotly.express as px
+
+    df_aux = rollup(cube, ['City', 'Road_traffic_density'])
     fig = px.sunburst(df_aux, path=['City', 'Road_traffic_density'], values='mean_delivery_time',
                     color='std_delivery_time', color_continuous_scale='RdBu_r',
                     color_continuous_midpoint=np.average(df_aux['std_delivery_time']))
     return fig
 
 # ======================================================= Início da estrutura lógica do código =====================================
-# Import dataset
-df = pd.read_csv('./datasets/train.csv')
+# Watcher do arquivo de dados: novas versões são montadas em segundo plano e trocadas de uma vez
+start_watcher()
 
-# Limpando os dados
-df1 = clean_code(df)
+# Colunas do dataset usadas nesta página (lidas depois dos filtros, só nas partições escolhidas)
+COLUMNS = ['Delivery_person_ID', 'Delivery_distance', 'Order_Date', 'Road_traffic_density', 'City']
+
+# Cubo pré-agregado para os tempos de entrega por festival, cidade, tráfego e tipo de pedido
+cube = load_cube()
+
+# Índice temporal (somas de prefixo por dia) para a janela de datas
+time_index = load_time_index()
 
 
 # ====================================================================================
@@ -106,41 +94,17 @@ df1 = clean_code(df)
 # ====================================================================================
 st.header('Marketplace - Visão Restaurantes')
 
-#image_path = '/home/ezequiel/Documentos/Comunidade_DS/Analise_dados_com_python/logo.jpeg'
-image = Image.open('logo.jpeg')      # Image.open bem da lib PIL
-st.sidebar.image(image, width=120)
-
-st.sidebar.markdown('# Curry Company')
-st.sidebar.markdown('## Fastest Delivery in Town')
-st.sidebar.markdown("""___""")
+date_slider, traffic_options = sidebar_filters(time_index)
 
-st.sidebar.markdown('## Selecione uma data limite')
+# Import dataset já limpo apenas com as partições (mês × cidade × trânsito) do período e do trânsito escolhidos.
+# No modo em blocos (CURRY_CHUNK_ROWS) o dataset não é carregado e só os painéis do cubo são exibidos
+df1 = load_window(date_slider, traffic_options, columns=COLUMNS) if not STREAM_CHUNK_ROWS else None
 
-date_slider = st.sidebar.slider(
-    'Até qual valor?',
-    value=pd.datetime(2022, 4, 13),
-    min_value=pd.datetime(2022, 2, 11),
-    max_value=pd.datetime(2022, 4, 6),
-    format='DD-MM-YYYY')
+# Mesmos filtros aplicados às células do cubo
+cube = filter_cube(cube, date_slider, traffic_options)
 
-st.sidebar.markdown("""___""")
-
-traffic_options = st.sidebar.multiselect(
-    'Quais as condições de trânsito?',
-    ['Low', 'Medium', 'High', 'Jam'],
-    default=['Low', 'Medium', 'High', 'Jam']
-)
-
-st.sidebar.markdown("""___""")
-st.sidebar.markdown('### Powered by Comunidade DS')
-
-# Filtro de data
-linhas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas, :]
-
-# Filtro de traffic density
-linhas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas, :]
+# estado dos filtros: os gráficos só são recalculados quando ele (ou a versão dos dados) muda
+state = filter_state(date_slider, traffic_options)
 
 
 # ====================================================================================
@@ -156,30 +120,40 @@ with tab1:
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                deliver_unique = len(df1.loc[:, 'Delivery_person_ID'].unique())
-                col1.metric('Entregadores únicos', deliver_unique)
+                if df1 is None:
+                    chunked_notice()
+                else:
+                    deliver_unique = panel_result('deliver_unique', state, unique_couriers, df1)
+                    col1.metric('Entregadores únicos', deliver_unique)
 
             with col2:
-                avg_distance = distance(df1, fig=False)
-                col2.metric('Distância média', avg_distance)
+                if df1 is None:
+                    chunked_notice()
+                else:
+                    avg_distance = panel_result('avg_distance', state, distance, df1, fig=False)
+                    col2.metric('Distância média', avg_distance)
 
             with col3:
-                df_aux = avg_std_time_delivery(df1, statistics='mean_delivery_time', festival='Yes')
+                df_aux = panel_result('avg_std_time_delivery', state + ('mean_delivery_time', 'Yes'), avg_std_time_delivery, cube,
+                                      statistics='mean_delivery_time', festival='Yes')
                 col3.metric('Tempo médio durante Festival', df_aux)
 
         with st.container():
             col4, col5, col6 = st.columns(3)
 
             with col4:
-                df_aux = avg_std_time_delivery(df1, statistics='std_delivery_time', festival='Yes')
+                df_aux = panel_result('avg_std_time_delivery', state + ('std_delivery_time', 'Yes'), avg_std_time_delivery, cube,
+                                      statistics='std_delivery_time', festival='Yes')
                 col4.metric('Desvio padrão durante Festival', df_aux)
 
             with col5:
-                df_aux = avg_std_time_delivery(df1, statistics='mean_delivery_time', festival='No')
+                df_aux = panel_result('avg_std_time_delivery', state + ('mean_delivery_time', 'No'), avg_std_time_delivery, cube,
+                                      statistics='mean_delivery_time', festival='No')
                 col5.metric('Tempo médio fora do Festival', df_aux)
 
             with col6:
-                df_aux = avg_std_time_delivery(df1, statistics='std_delivery_time', festival='No')
+                df_aux = panel_result('avg_std_time_delivery', state + ('std_delivery_time', 'No'), avg_std_time_delivery, cube,
+                                      statistics='std_delivery_time', festival='No')
                 col6.metric('Desvio padrão fora do Festival', df_aux)
 
         st.markdown("""___""")
@@ -189,23 +163,14 @@ with tab1:
 
         with col7:
             st.markdown('#### Tempo médio da entrega por cidade')
-            cols = ['Time_taken(min)', 'City']
-            df_aux = df1.loc[:, cols].groupby(['City']).agg({'Time_taken(min)': ['mean','std']})
-            df_aux.columns = ['mean_delivery_time', 'std_delivery_time']
-            df_aux = df_aux.reset_index()
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name = 'Control', x=df_aux['City'], y=df_aux['mean_delivery_time'], error_y=dict(type='data', array=df_aux['std_delivery_time'])))
-            fig.update_layout(barmode='group')
-            st.plotly_chart(fig, use_container_width=True)
+            fig, payload = chart_result('time_by_city', state, time_by_city, cube)
+            plotly_chart(fig, payload)
 
         with col8:
             st.markdown('#### Distâncias')
-            cols = ['Time_taken(min)', 'City', 'Type_of_order']
-            df_aux = df1.loc[:, cols].groupby(['City', 'Type_of_order']).agg({'Time_taken(min)': ['mean','std']})
-            df_aux.columns = ['mean_delivery_time', 'std_delivery_time']
-            df_aux = df_aux.reset_index()
-            st.dataframe(df_aux)
+            cols = ['City', 'Type_of_order', 'mean_delivery_time', 'std_delivery_time']
+            df_aux = panel_result('time_by_city_order', state, rollup, cube, ['City', 'Type_of_order']).loc[:, cols]
+            paged_dataframe(df_aux, key='city_order', sort_by='City', search_column='Type_of_order')
 
         st.markdown("""___""")
 
@@ -214,11 +179,84 @@ with tab1:
         col9, col10 = st.columns(2, gap='medium')
 
         with col9:  
-            fig = distance(df1, fig=True)
-            st.plotly_chart(fig, use_container_width=True)
+            if df1 is None:
+                chunked_notice()
+            else:
+                fig, payload = chart_result('distance', state, distance, df1, fig=True)
+                plotly_chart(fig, payload)
             
         with col10:
-            fig = avg_std_time_on_traffic(df1)
-            st.plotly_chart(fig, use_container_width=True)
+            fig, payload = chart_result('avg_std_time_on_traffic', state, avg_std_time_on_traffic, cube)
+            plotly_chart(fig, payload)
+
+        st.markdown("""___""")
+
+    with st.container():
+        if lazy_panel('Consultas espaciais', key='show_spatial'):
+            if STREAM_CHUNK_ROWS:
+                chunked_notice()
+            else:
+                # índice espacial (grade) dos locais de entrega e dos restaurantes, carregado só com a seção aberta
+                spatial_index = load_spatial_index()
+
+                col11, col12, col13, col14 = st.columns(4)
+                with col11:
+                    point_lat = st.number_input('Latitude', value=float(np.round(spatial_index['restaurant_radius']['Restaurant_latitude'].median(), 4)), format='%.4f')
+                with col12:
+                    point_lon = st.number_input('Longitude', value=float(np.round(spatial_index['restaurant_radius']['Restaurant_longitude'].median(), 4)), format='%.4f')
+                with col13:
+                    radius_km = st.number_input('Raio (km)', min_value=0.1, value=5.0)
+                with col14:
+                    nearest_k = st.number_input('Restaurantes mais próximos', min_value=1, max_value=50, value=5)
+
+                col15, col16 = st.columns(2, gap='medium')
+                with col15:
+                    st.markdown('#### Pedidos entregues no raio')
+                    # dataset sem filtros, carregado só com a seção aberta (as posições são do dataset inteiro)
+                    df_all = load_dataset(columns=COLUMNS)
+                    df_aux = orders_near(df_all, spatial_index, time_index, point_lat, point_lon, radius_km, date_slider, traffic_options)
+                    st.metric('Pedidos', len(df_aux))
+                    df_aux = df_aux.groupby(['City', 'Road_traffic_density'], observed=True).agg(
+                        orders=('distance_km', 'size'), mean_distance_km=('distance_km', 'mean')).reset_index()
+                    st.dataframe(df_aux)
+
+                with col16:
+                    st.markdown('#### Restaurantes mais próximos')
+                    df_aux = nearest_restaurants(spatial_index, point_lat, point_lon, int(nearest_k))
+                    st.dataframe(df_aux)
+
+                st.markdown('#### Raio de entrega por restaurante (todo o histórico)')
+                df_aux = spatial_index['restaurant_radius'].nlargest(20, 'p90_km')
+                st.dataframe(df_aux)
+
+        st.markdown("""___""")
+
+    with st.container():
+        if lazy_panel('Restaurantes (todo o histórico)', key='show_restaurants'):
+            if STREAM_CHUNK_ROWS:
+                chunked_notice()
+            else:
+                # tabela por restaurante (Restaurant_ID derivado das coordenadas), carregada só com a seção aberta
+                restaurant_table = load_restaurant_table()
+
+                col17, col18, col19, col20 = st.columns(4)
+                with col17:
+                    restaurant_query = st.text_input('Buscar Restaurant_ID')
+                with col18:
+                    restaurant_city = st.selectbox('Cidade', ['Todas'] + sorted(restaurant_table['City'].dropna().unique()))
+                with col19:
+                    restaurant_sort = st.selectbox('Ordenar por', ['orders', 'mean_delivery_time', 'std_delivery_time',
+                                                                   'mean_distance_km', 'festival_share'])
+                with col20:
+                    restaurant_ascending = st.checkbox('Ordem crescente', value=False)
+
+                df_aux = search_restaurants(restaurant_table, restaurant_query,
+                                            city=None if restaurant_city == 'Todas' else restaurant_city,
+                                            sort_by=restaurant_sort, ascending=restaurant_ascending)
+                st.metric('Restaurantes', len(restaurant_table))
+                st.dataframe(df_aux)
+
+        st.markdown("""___""")
 
-        st.markdown("""___""")
\ No newline at end of file
+cache_caption()
+data_caption()
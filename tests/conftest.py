@@ -0,0 +1,29 @@
+# Libraries
+import pytest
+
+from benchmarks.generate import generate
+from curry import schema
+from curry.loader import clean_code, derive_columns
+
+# pedidos sintéticos dos testes: poucos dias, para haver vários pedidos por grupo (dia × cidade × trânsito)
+ROWS = 6000
+DAYS = 40
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def clean(path):
+    """ Finalidade da função:
+        1. Ler e limpar um CSV como a ingestão do dataset (curry.loader.read_clean), ordenado por Order_Date
+        Input: caminho do CSV
+        Output: Dataframe limpo
+    """
+    df1 = schema.compact(derive_columns(clean_code(schema.read_source(path))))
+    return df1.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+
+
+@pytest.fixture(scope='session')
+def orders(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('data') / 'train.csv')
+    return clean(generate(ROWS, path, seed=7, days=DAYS))
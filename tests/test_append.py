@@ -0,0 +1,88 @@
+# Libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry import schema
+from curry.couriers import append_courier_profiles, build_courier_profiles, courier_rows
+from curry.cube import DIMENSIONS, append_cube, build_cube
+from curry.timeindex import MEASURES, append_time_index, build_time_index
+
+# entregador que só aparece no lote acrescentado
+NEW_COURIER = 'NEWRES01DEL01'
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def split(df1, at):
+    """ Finalidade da função:
+        1. Separar o dataset em parte guardada e lote acrescentado, como curry.append: cada parte só conhece
+           as próprias categorias e o lote traz um entregador novo
+        2. O dataset completo é a concatenação das duas partes (loader.read_clean com lotes em ordem)
+        Input: Dataframe limpo ordenado por Order_Date, linha onde o lote começa
+        Output: tupla (parte guardada, lote, dataset completo)
+    """
+    base, batch = df1.iloc[:at].reset_index(drop=True), df1.iloc[at:].reset_index(drop=True)
+    for df_aux in [base, batch]:
+        for col in df_aux.select_dtypes(include='category').columns:
+            df_aux[col] = df_aux[col].cat.remove_unused_categories()
+
+    couriers = batch['Delivery_person_ID'].cat.add_categories([NEW_COURIER])
+    batch['Delivery_person_ID'] = couriers.mask(batch.index % 7 == 0, NEW_COURIER)
+    return base, batch, schema.compact(pd.concat([base, batch], ignore_index=True))
+
+
+def boundaries(df1):
+    # uma divisão no início de um dia e outra no meio do dia (o lote começa no último dia guardado)
+    starts = np.flatnonzero(df1['Order_Date'].ne(df1['Order_Date'].shift()).to_numpy())
+    day = starts[len(starts) * 3 // 4]
+    return [day, day + 10]
+
+
+@pytest.fixture(scope='module', params=[0, 1], ids=['new-day', 'same-day'])
+def parts(request, orders):
+    return split(orders, boundaries(orders)[request.param])
+
+
+def test_cube_append_matches_rebuild(parts):
+    base, batch, full = parts
+    appended = append_cube(build_cube(base), build_cube(batch))
+    rebuilt = build_cube(full)
+
+    def normalized(cube):
+        cube = cube.astype({col: str for col in DIMENSIONS[1:]})
+        return cube.sort_values(DIMENSIONS, ignore_index=True).loc[:, rebuilt.columns]
+
+    pd.testing.assert_frame_equal(normalized(appended), normalized(rebuilt), check_dtype=False)
+    for col in DIMENSIONS[1:]:
+        assert isinstance(appended[col].dtype, pd.CategoricalDtype)
+
+
+def test_time_index_append_matches_rebuild(parts):
+    base, batch, full = parts
+    appended = append_time_index(build_time_index(base), build_time_index(batch), len(base))
+    rebuilt = build_time_index(full)
+
+    np.testing.assert_array_equal(appended['days'], rebuilt['days'])
+    np.testing.assert_array_equal(appended['row_offsets'], rebuilt['row_offsets'])
+    assert appended['traffic'] == rebuilt['traffic']
+    for measure in MEASURES:
+        np.testing.assert_allclose(appended['prefix'][measure], rebuilt['prefix'][measure])
+
+
+def test_courier_profiles_append_match_rebuild(parts):
+    base, batch, full = parts
+    appended = append_courier_profiles(build_courier_profiles(base), build_courier_profiles(batch), len(base))
+    rebuilt = build_courier_profiles(full)
+
+    def normalized(profiles):
+        return profiles.set_axis(profiles.index.astype(str)).sort_index()
+
+    pd.testing.assert_frame_equal(normalized(appended['profiles']), normalized(rebuilt['profiles']),
+                                  check_dtype=False, check_index_type=False)
+    assert NEW_COURIER in appended['couriers']
+
+    # linhas de cada entregador: as mesmas posições, em ordem de data
+    for courier in rebuilt['couriers']:
+        np.testing.assert_array_equal(courier_rows(appended, courier), courier_rows(rebuilt, courier))
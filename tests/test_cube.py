@@ -0,0 +1,36 @@
+# Libraries
+import numpy as np
+import pytest
+
+from curry.cube import append_cube, build_cube, filter_cube, rollup
+from curry.timeindex import build_time_index, window_totals
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+@pytest.fixture(scope='module')
+def blanked(orders):
+    # clima ausente em 10% dos pedidos (o sentinela 'NaN ' vira NaN na leitura e a coluna não é obrigatória)
+    df1 = orders.copy()
+    df1['Weatherconditions'] = df1['Weatherconditions'].mask(np.arange(len(df1)) % 10 == 0)
+    return df1
+
+
+@pytest.mark.parametrize('by', [['City'], ['Weatherconditions'], ['City', 'Type_of_order']])
+def test_rollup_counts_every_order(blanked, by):
+    cube = build_cube(blanked)
+
+    assert cube['orders'].sum() == len(blanked)
+    assert rollup(cube, by)['orders'].sum() == len(blanked)
+
+
+def test_cube_window_matches_time_index(blanked):
+    days = blanked['Order_Date'].drop_duplicates().to_numpy()
+    date_range, traffic_options = (days[3], days[30]), ['Low', 'Jam']
+    half = len(blanked) // 2
+
+    # cubo montado de uma vez e montado por append: mesmos pedidos que os totais do índice temporal
+    expected = window_totals(build_time_index(blanked), date_range, traffic_options)['orders']
+    for cube in [build_cube(blanked), append_cube(build_cube(blanked.iloc[:half]), build_cube(blanked.iloc[half:]))]:
+        assert filter_cube(cube, date_range, traffic_options)['orders'].sum() == expected
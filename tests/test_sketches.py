@@ -0,0 +1,107 @@
+# Libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.sketches import (DISTINCT_ERROR, build_sketches, delivery_time_percentiles, digest_quantiles,
+                            distinct_count, merge_sketches)
+from curry.weekly import week_key
+
+QS = [0.5, 0.9, 0.99]
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def window(df1, date_range, traffic_options):
+    # pedidos da janela, com o mesmo critério da barra lateral (datas inclusivas)
+    start, end = (pd.Timestamp(d) for d in date_range)
+    mask = df1['Order_Date'].between(start, end) & df1['Road_traffic_density'].isin(traffic_options)
+    return df1.loc[mask, :]
+
+
+@pytest.fixture(scope='module')
+def date_range(orders):
+    days = orders['Order_Date'].drop_duplicates().sort_values().to_numpy()
+    return days[5], days[25]
+
+
+@pytest.mark.parametrize('traffic_options', [['Low', 'Medium', 'High', 'Jam'], ['Low', 'Jam']])
+def test_exact_distinct_matches_nunique(orders, date_range, traffic_options):
+    sketches = build_sketches(orders, exact=True)
+    df_aux = window(orders, date_range, traffic_options)
+
+    expected = df_aux['Delivery_person_ID'].nunique()
+    assert distinct_count(sketches['couriers'], date_range, traffic_options) == expected
+
+    expected = df_aux.groupby(week_key(df_aux['Order_Date']))['Delivery_person_ID'].nunique()
+    weekly = distinct_count(sketches['couriers'], date_range, traffic_options, by_week=True)
+    pd.testing.assert_series_equal(weekly, expected, check_names=False, check_dtype=False)
+
+
+@pytest.mark.parametrize('by', [None, ['City'], ['City', 'Road_traffic_density']])
+def test_exact_quantiles_match_pandas(orders, date_range, by):
+    traffic_options = ['Low', 'High', 'Jam']
+    sketches = build_sketches(orders, exact=True)
+    df_aux = window(orders, date_range, traffic_options)
+    time = df_aux['Time_taken(min)'].astype('float64')
+
+    result = delivery_time_percentiles(sketches, date_range, traffic_options, QS, by)
+    if by is None:
+        np.testing.assert_allclose(result.loc[0, QS].to_numpy(dtype='float64'), time.quantile(QS).to_numpy())
+        return
+
+    expected = time.groupby([df_aux[col] for col in by], observed=True).quantile(QS).unstack()
+    for row in result.itertuples(index=False):
+        key = tuple(row[:len(by)])
+        np.testing.assert_allclose(row[len(by):], expected.loc[key if len(by) > 1 else key[0]].to_numpy())
+    assert len(result) == len(expected)
+
+
+def test_sketches_within_error(orders, date_range):
+    traffic_options = ['Low', 'Medium', 'High', 'Jam']
+    sketches = build_sketches(orders)
+    df_aux = window(orders, date_range, traffic_options)
+
+    estimate = distinct_count(sketches['couriers'], date_range, traffic_options)
+    exact = df_aux['Delivery_person_ID'].nunique()
+    assert abs(estimate - exact) <= 3 * DISTINCT_ERROR * exact
+
+    # t-digest: erro de quantil pequeno perto das caudas, medido na posição (rank) do valor estimado
+    time = np.sort(df_aux['Time_taken(min)'].to_numpy(dtype='float64'))
+    result = delivery_time_percentiles(sketches, date_range, traffic_options, QS)
+    for q in QS:
+        lo, hi = np.searchsorted(time, result.loc[0, q], 'left'), np.searchsorted(time, result.loc[0, q], 'right')
+        assert lo / len(time) - 0.01 <= q <= hi / len(time) + 0.01
+
+
+@pytest.mark.parametrize('exact', [True, False])
+def test_merged_parts_match_whole(orders, date_range, exact):
+    half = len(orders) // 2
+    whole = build_sketches(orders, exact=exact)
+    merged = merge_sketches([build_sketches(orders.iloc[:half], exact=exact),
+                             build_sketches(orders.iloc[half:], exact=exact)])
+
+    # registradores HyperLogLog (máximo por grupo) e valores distintos não dependem da divisão em partes
+    if exact:
+        pd.testing.assert_frame_equal(merged['couriers']['values'], whole['couriers']['values'])
+    else:
+        pd.testing.assert_frame_equal(merged['couriers']['keys'], whole['couriers']['keys'])
+        np.testing.assert_array_equal(merged['couriers']['registers'], whole['couriers']['registers'])
+
+    traffic_options = ['Low', 'Medium', 'High', 'Jam']
+    assert distinct_count(merged['couriers'], date_range, traffic_options) == \
+        distinct_count(whole['couriers'], date_range, traffic_options)
+    if exact:
+        pd.testing.assert_frame_equal(delivery_time_percentiles(merged, date_range, traffic_options, QS, ['City']),
+                                      delivery_time_percentiles(whole, date_range, traffic_options, QS, ['City']))
+
+
+@pytest.mark.parametrize('by', [None, ['City']])
+def test_empty_window_has_no_rows(orders, date_range, by):
+    sketches = build_sketches(orders, exact=True)
+
+    result = digest_quantiles(sketches['time'], QS, date_range, [], by, exact=True)
+    assert result.empty
+    assert list(result.columns) == (by or []) + QS
+    assert distinct_count(sketches['couriers'], date_range, []) == 0
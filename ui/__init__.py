@@ -0,0 +1 @@
+""" Componentes de interface (Streamlit) compartilhados pelas páginas do dashboard. """
@@ -0,0 +1,58 @@
+# Libraries
+# (plotly.express é importado só ao montar um gráfico: importar este módulo não carrega o plotly)
+import streamlit as st
+
+from curry.downsample import bucket_daily, lttb
+
+# séries mais longas que isto são reduzidas no servidor antes de montar a figura
+MAX_POINTS = 500
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def time_series_chart(df1, x, y, kind='line', max_points=MAX_POINTS):
+    """ Finalidade da função:
+        1. Montar um gráfico de série temporal com tamanho de figura limitado
+        2. kind='bar' (contagens por dia): agrupa dia -> semana -> mês até caber em max_points
+        3. kind='line': reduz com LTTB para max_points pontos
+        Input: Dataframe, coluna x, coluna y, tipo do gráfico, limite de pontos (None envia a série completa)
+        Output: Fig
+    """
+    import plotly.express as px
+
+    if kind == 'bar' and max_points is not None:
+        df_aux, period = bucket_daily(df1, x, y, max_points)
+        fig = px.bar(df_aux, x=x, y=y)
+        if period != 'dia':
+            fig.update_layout(title='Agrupado por {}'.format(period))
+        return fig
+
+    if kind == 'bar':
+        return px.bar(df1, x=x, y=y)
+
+    df_aux = df1 if max_points is None else df1.iloc[lttb(df1[x].to_numpy(), df1[y].to_numpy(), max_points)]
+    return px.line(df_aux, x=x, y=y)
+
+
+def figure_payload(fig):
+    """ Finalidade da função:
+        1. Tamanho, em bytes, do JSON da figura enviado ao navegador
+        Input: Fig
+        Output: int
+    """
+    return len(fig.to_json())
+
+
+def plotly_chart(fig, payload=None):
+    """ Finalidade da função:
+        1. Exibir a figura e informar o tamanho do payload enviado ao navegador
+        2. payload já medido (ui.panels.chart_result guarda o tamanho junto com a figura) evita
+           serializar a figura a cada rerun só para a legenda
+        Input: Fig, tamanho do payload em bytes (None = medir agora)
+        Output: None
+    """
+    if payload is None:
+        payload = figure_payload(fig)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption('Payload do gráfico: {:.1f} KB'.format(payload / 1024))
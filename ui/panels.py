@@ -0,0 +1,103 @@
+# Libraries
+import streamlit as st
+
+from curry.loader import DATA_PATH, current_version
+from curry.memo import cache_stats, memoized
+from curry.watcher import watcher_status
+from ui.charts import figure_payload
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def view_selector(views, key, label='Visão'):
+    """ Finalidade da função:
+        1. Substituir st.tabs por um seletor: com st.tabs o código de todas as abas roda a cada rerun,
+           com o seletor apenas a visão escolhida é calculada e desenhada
+        Input: lista com os nomes das visões, chave do widget, rótulo
+        Output: String com a visão escolhida
+    """
+    return st.radio(label, views, horizontal=True, key=key, label_visibility='collapsed')
+
+
+def lazy_panel(title, key, expanded=False):
+    """ Finalidade da função:
+        1. Título de uma seção cara com uma caixa para exibi-la: enquanto estiver fechada, o código
+           da seção não roda (um st.expander esconde o conteúdo, mas ainda o calcula)
+        Input: título da seção, chave do widget, aberta por padrão
+        Output: bool indicando se a seção deve ser calculada
+    """
+    st.title(title)
+    return st.checkbox('Exibir', value=expanded, key=key)
+
+
+def filter_state(date_range, traffic_options, path=DATA_PATH):
+    """ Finalidade da função:
+        1. Identificar o estado dos filtros da barra lateral junto com a versão dos dados
+        Input: período (início, fim), condições de trânsito, caminho do arquivo
+        Output: tupla (versão dos dados, período, condições de trânsito ordenadas)
+    """
+    return current_version(path), tuple(date_range), tuple(sorted(traffic_options))
+
+
+def chunked_notice():
+    """ Finalidade da função:
+        1. Aviso exibido no lugar de um painel que precisa dos pedidos linha a linha: no modo em blocos
+           (CURRY_CHUNK_ROWS) só existem os agregados (cubo, índice temporal, sketches)
+        Input: None
+        Output: None
+    """
+    st.info('Este painel precisa do dataset em memória: o modo em blocos (CURRY_CHUNK_ROWS) está ativo.')
+
+
+def panel_result(key, state, builder, *args, **kwargs):
+    """ Finalidade da função:
+        1. Buscar o resultado de um painel no cache LRU do processo (curry.memo), compartilhado entre as sessões
+        2. Voltar a uma visão ou a uma combinação de filtros já usada não recalcula nada
+        Input: nome do painel, estado (ex.: filter_state), função que calcula o resultado e seus argumentos
+        Output: resultado de builder(*args, **kwargs) (compartilhado, não deve ser alterado)
+    """
+    return memoized(key, state, builder, *args, **kwargs)
+
+
+def chart_result(key, state, builder, *args, **kwargs):
+    """ Finalidade da função:
+        1. Como panel_result, para gráficos: a figura e o tamanho do seu payload são guardados juntos,
+           então uma figura já calculada não é serializada de novo a cada rerun
+        Input: nome do gráfico, estado (ex.: filter_state), função que monta a figura e seus argumentos
+        Output: tupla (Fig, tamanho do payload em bytes) para ui.charts.plotly_chart
+    """
+    return memoized(key, state, _with_payload, builder, *args, **kwargs)
+
+
+def _with_payload(builder, *args, **kwargs):
+    fig = builder(*args, **kwargs)
+    return fig, figure_payload(fig)
+
+
+def cache_caption():
+    """ Finalidade da função:
+        1. Mostrar na barra lateral os contadores do cache de resultados
+        Input: None
+        Output: None
+    """
+    stats = cache_stats()
+    st.sidebar.caption('Cache de resultados: {} acertos, {} faltas, {} itens ({:.1f} MB)'.format(
+        stats['hits'], stats['misses'], stats['entries'], stats['bytes'] / 1024 ** 2))
+
+
+def data_caption(path=DATA_PATH):
+    """ Finalidade da função:
+        1. Mostrar na barra lateral a versão dos dados servida e se há uma nova versão sendo montada
+           pelo watcher (curry.watcher) ou um erro na última tentativa
+        Input: caminho do arquivo
+        Output: None
+    """
+    status = watcher_status(path)
+    if status is None:
+        return
+    st.sidebar.caption('Dados: versão {}'.format(status['published']))
+    if status['building'] is not None:
+        st.sidebar.caption('Nova versão dos dados sendo montada em segundo plano')
+    if status['error'] is not None:
+        st.sidebar.caption('Erro ao atualizar os dados: {}'.format(status['error']))
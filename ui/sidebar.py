@@ -0,0 +1,54 @@
+# Libraries
+import pandas as pd
+import streamlit as st
+
+TRAFFIC_OPTIONS = ['Low', 'Medium', 'High', 'Jam']
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def sidebar_header():
+    """ Finalidade da função:
+        1. Logo e título da barra lateral (st.image lê o arquivo direto, sem importar o PIL na página)
+        Input: None
+        Output: None
+    """
+    st.sidebar.image('logo.jpeg', width=120)
+
+    st.sidebar.markdown('# Curry Company')
+    st.sidebar.markdown('## Fastest Delivery in Town')
+    st.sidebar.markdown("""___""")
+
+
+def sidebar_filters(time_index):
+    """ Finalidade da função:
+        1. Desenhar a barra lateral com os filtros de período e de condições de trânsito
+        2. Os limites do período vêm dos dias do índice temporal (sem varrer o dataset)
+        Input: índice temporal
+        Output: tupla (período (início, fim), lista de condições de trânsito)
+    """
+    sidebar_header()
+
+    st.sidebar.markdown('## Selecione o período')
+
+    first_day = pd.Timestamp(time_index['days'][0]).to_pydatetime()
+    last_day = pd.Timestamp(time_index['days'][-1]).to_pydatetime()
+    date_slider = st.sidebar.slider(
+        'Qual período?',
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day,
+        format='DD-MM-YYYY')
+
+    st.sidebar.markdown("""___""")
+
+    traffic_options = st.sidebar.multiselect(
+        'Quais as condições de trânsito?',
+        TRAFFIC_OPTIONS,
+        default=TRAFFIC_OPTIONS
+    )
+
+    st.sidebar.markdown("""___""")
+    st.sidebar.markdown('### Powered by Comunidade DS')
+    return date_slider, traffic_options
@@ -0,0 +1,38 @@
+# Libraries
+import streamlit as st
+
+from curry.table import page_count, table_page
+
+
+# ====================================================================================
+# Funções
+# ====================================================================================
+def paged_dataframe(df1, key, page_size=50, sort_by=None, ascending=True, search_column=None):
+    """ Finalidade da função:
+        1. Exibir uma tabela paginada: ordenação, busca e recorte são feitos no servidor (curry.table)
+           e apenas a página visível é enviada ao navegador
+        2. key diferencia os widgets de cada tabela na mesma página
+        Input: Dataframe, chave dos widgets, linhas por página, ordenação inicial, ascending, coluna de busca
+        Output: None
+    """
+    df1 = df1.reset_index() if df1.index.name is not None else df1
+    columns = list(df1.columns)
+
+    col1, col2, col3, col4 = st.columns([3, 3, 2, 2])
+    with col1:
+        sort_by = st.selectbox('Ordenar por', columns, index=columns.index(sort_by) if sort_by in columns else 0,
+                               key=key + '_sort')
+    with col2:
+        search = st.text_input('Buscar em {}'.format(search_column), key=key + '_search') if search_column else None
+    with col3:
+        ascending = st.checkbox('Crescente', value=ascending, key=key + '_asc')
+    with col4:
+        page = st.number_input('Página', min_value=1, value=1, step=1, key=key + '_page')
+
+    df_page, total = table_page(df1, page, page_size, sort_by, ascending, search, search_column)
+    st.dataframe(df_page)
+
+    page = min(int(page), page_count(total, page_size))
+    first = (page - 1) * page_size + 1 if total else 0
+    st.caption('Linhas {}–{} de {} (página {} de {})'.format(first, first + len(df_page) - 1 if total else 0,
+                                                            total, page, page_count(total, page_size)))